@@ -1,19 +1,36 @@
 import sys
-import requests
+import time
+import random
+STARTUP_STARTED = time.perf_counter()  # Начало отсчета для отчета --profile-startup
 import json
 import os
-from datetime import datetime, timedelta, timezone
-from matplotlib.backends.backend_qtagg import FigureCanvas
-from matplotlib.figure import Figure
-from matplotlib import font_manager
-import matplotlib as mpl
+import math
+import hashlib
+import uuid
+import contextvars
+import sqlite3
+import threading
+from contextlib import contextmanager
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from email.utils import parsedate_to_datetime
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from dataclasses import dataclass
+from urllib.parse import urlparse
 from PyQt6 import QtWidgets, QtCore, QtGui
 from PyQt6.QtGui import QFontDatabase
 from data import PROJECT_ID, API_TOKEN
 
 
 # ============ НАСТРОЙКИ ============
-UPDATE_INTERVAL = 15000
+UPDATE_INTERVAL = 15000  # Мс между обновлениями после действий пользователя или изменений
+REFRESH_MAX_INTERVAL = 300  # Секунды: до этого интервала обновления реже, пока данные не меняются
+REFRESH_IDLE_FACTOR = 2.0  # Во сколько раз растет интервал после обновления без изменений
+REFRESH_ACTIVITY_WINDOW = 120  # Секунды после действия пользователя, когда обновляемся часто
+REFRESH_JITTER = 0.2  # Случайный разброс интервала (+-20%), чтобы дашборды одного аккаунта не совпадали
+API_REQUEST_BUDGET = 400  # Запросов на токен за окно (лимит Todoist 450; меньше - если дашбордов несколько)
+API_BUDGET_WINDOW = 900  # Окно лимита запросов, секунды
 
 CUSTOM_FONT_PATH = "fonts/MyFont.ttf"
 USE_CUSTOM_FONT = False
@@ -23,14 +40,84 @@ FONT_SIZE = 10
 MONTHLY_GOAL = 100
 WEEKLY_GOAL = 7   # Цель на неделю
 MONTHLY_STATS_GOAL = 30  # Цель на месяц для статистики
-CACHE_FILE = "todoist_cache.json"
+CACHE_FILE = "todoist_cache.json"  # Устаревший JSON-кэш (до перехода на SQLite)
+STORE_DB_FILE = "todoist_store.db"  # Локальное хранилище SQLite
+STORE_WRITE_DELAY = 2.0  # Секунды, за которые изменения собираются в одну запись
 OLD_TASK_DAYS = 30  # Количество дней для определения "заждавшихся" задач
 EVENTS_FILE = "scheduled_events.json"  # Файл для хранения событий
+COMPLETED_HISTORY_DAYS = 365
+REST_API_URL = "https://api.todoist.com/rest/v2"
+SYNC_API_URL = "https://api.todoist.com/sync/v9"  # Можно указать локальный тестовый сервер
+SYNC_RESOURCE_TYPES = ['items', 'sections']
+SYNC_COMMANDS_LIMIT = 100  # Максимум команд в одном запросе Sync API
+OUTBOX_BACKOFF_BASE = 60  # Секунды до повтора неудавшегося создания задачи, удваивается
+OUTBOX_MAX_BACKOFF = 3600
+OUTBOX_MAX_ATTEMPTS = 10  # После стольких отказов сервера задача больше не отправляется (сбои сети не считаются)
+OUTBOX_KEEP_DAYS = 30  # Сколько дней хранить отправленные записи очереди
+TASK_CATCH_UP_DAYS = 7  # За сколько пропущенных дней (сон, выключенное приложение) досоздавать задачи
+TASK_CHECK_MAX_INTERVAL = 900  # Секунды: часы сверяются не реже (во сне таймер может стоять)
+FETCH_TTL = {  # Секунды между запросами ресурса, который нужен видимой странице (0 - каждое обновление)
+    'items': 0,
+    'completed': 0,  # Догружаются только задачи новее сохраненной отметки
+    'sections': 3600  # Разделы меняются редко
+}
+FETCH_BACKGROUND_TTL = 900  # Секунды: ресурсы, которые не нужны видимой странице, обновляются не чаще
+
+HTTP_CONNECT_TIMEOUT = 5  # Секунды на установку соединения
+HTTP_READ_TIMEOUT = 30  # Секунды на ожидание ответа
+HTTP_POOL_SIZE = 10  # Соединений keep-alive на хост
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 1.0  # Задержка первого повтора, удваивается с каждой попыткой
+HTTP_MAX_RETRY_DELAY = 60  # Верхняя граница задержки (в том числе из Retry-After)
+HTTP_LOG_TIMINGS = False  # Печатать время каждого запроса
+LOADER_MAX_WORKERS = 4  # Сколько запросов загрузчик выполняет одновременно
+COMPLETED_WINDOW_DAYS = 30  # Размер окна при первой загрузке истории
+COMPLETED_WINDOW_WORKERS = 6  # Сколько окон загружается одновременно
+
+CHART_BACKEND = "image"  # "matplotlib" - MplCanvas, "native" - QPainter без импорта matplotlib, "image" - matplotlib в фоновом потоке
+CHART_IMAGE_CACHE_SIZE = 24  # Готовых картинок графиков в памяти (данные x размер)
+CHART_IMAGE_DPI = 100
+CHART_RESIZE_DELAY = 150  # Мс после изменения размера до перерисовки графика в фоне
 # ===================================
 
 
+class StartupProfile:
+    """Замеры этапов запуска для отчета --profile-startup"""
+    
+    def __init__(self, started):
+        self.last_mark = started
+        self.marks = []  # [(этап, мс)] - последовательные этапы запуска
+        self.lazy_loads = []  # [(что загружено, мс)] - отложенные импорты, в том числе в фоне
+    
+    def mark(self, name):
+        """Закончить этап запуска: время с предыдущей отметки"""
+        now = time.perf_counter()
+        self.marks.append((name, (now - self.last_mark) * 1000))
+        self.last_mark = now
+    
+    @contextmanager
+    def measure(self, name):
+        """Замерить отложенную загрузку модуля"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.lazy_loads.append((name, (time.perf_counter() - start) * 1000))
+    
+    def report(self):
+        print("⏱️ Запуск приложения:")
+        for name, elapsed in self.marks:
+            print(f"   {name:<28} {elapsed:>8.1f} мс")
+        print(f"   {'итого':<28} {sum(elapsed for _, elapsed in self.marks):>8.1f} мс")
+        for name, elapsed in self.lazy_loads:
+            print(f"   (отложенно) {name:<16} {elapsed:>8.1f} мс")
+
+
+STARTUP_PROFILE = StartupProfile(STARTUP_STARTED)
+
+
 def setup_custom_font(font_path=None):
-    """Настройка кастомного шрифта для PyQt6 и Matplotlib"""
+    """Настройка кастомного шрифта для PyQt6 (matplotlib получает его при первом холсте)"""
     if font_path and USE_CUSTOM_FONT:
         try:
             font_id = QFontDatabase.addApplicationFont(font_path)
@@ -43,10 +130,6 @@ def setup_custom_font(font_path=None):
             if families:
                 font_family = families[0]
                 print(f"✅ Загружен шрифт: {font_family}")
-                
-                font_manager.fontManager.addfont(font_path)
-                mpl.rcParams['font.family'] = font_family
-                
                 return font_family
             else:
                 return DEFAULT_FONT_FAMILY
@@ -55,44 +138,1248 @@ def setup_custom_font(font_path=None):
             print(f"❌ Ошибка при загрузке шрифта: {e}")
             return DEFAULT_FONT_FAMILY
     else:
-        mpl.rcParams['font.family'] = DEFAULT_FONT_FAMILY
         return DEFAULT_FONT_FAMILY
 
 
-class DataCache:
-    """Класс для работы с кэшем данных"""
+@lru_cache(maxsize=None)
+def setup_matplotlib_font(font_family):
+    """Передать matplotlib шрифт приложения"""
+    from matplotlib import font_manager
+    import matplotlib as mpl
+    
+    if USE_CUSTOM_FONT and font_family != DEFAULT_FONT_FAMILY:
+        font_manager.fontManager.addfont(CUSTOM_FONT_PATH)
+    mpl.rcParams['font.family'] = font_family
+
+
+@lru_cache(maxsize=None)
+def import_matplotlib(font_family):
+    """Импортировать matplotlib при создании первого холста и передать ему шрифт"""
+    with STARTUP_PROFILE.measure('импорт matplotlib'):
+        from matplotlib.backends.backend_qtagg import FigureCanvas
+        from matplotlib.figure import Figure
+    
+    setup_matplotlib_font(font_family)
+    return FigureCanvas, Figure
+
+
+@lru_cache(maxsize=None)
+def import_matplotlib_agg(font_family):
+    """Импорт matplotlib для фонового рендера: холст Agg без Qt"""
+    with STARTUP_PROFILE.measure('импорт matplotlib (фон)'):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+    
+    setup_matplotlib_font(font_family)
+    return FigureCanvasAgg, Figure
+
+
+def parse_todoist_datetime(value):
+    """Разобрать дату Todoist в формате ISO 8601 ('...Z') в datetime с часовым поясом"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def format_todoist_datetime(value):
+    """Записать datetime в формате completed_at Todoist (для сравнения строк в SQLite)"""
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def dashboard_window_day(today=None):
+    """Первый локальный день периода, который показывают страницы: начало текущей недели или месяца"""
+    today = today or date.today()
+    return min(today - timedelta(days=today.weekday()), today.replace(day=1))
+
+
+def dashboard_window_start(window_day=None):
+    """Момент UTC, с которого страницам нужны выполненные задачи (локальное начало окна с запасом в сутки)"""
+    local_midnight = datetime.combine(window_day or dashboard_window_day(), datetime.min.time()).astimezone()
+    return local_midnight.astimezone(timezone.utc) - timedelta(days=1)
+
+
+@lru_cache(maxsize=262144)
+def timestamp_parts(value):
+    """(epoch, локальный день как ordinal, день недели) для даты Todoist.
+    
+    Результат кэшируется: одна и та же строка разбирается один раз за время работы.
+    """
+    moment = parse_todoist_datetime(value).astimezone()
+    return moment.timestamp(), moment.toordinal(), moment.weekday()
+
+
+def local_utc_offset(epoch):
+    """Смещение местного часового пояса (секунды) в момент epoch"""
+    return int(datetime.fromtimestamp(epoch).astimezone().utcoffset().total_seconds())
+
+
+class TaskColumns:
+    """Колоночное представление списка задач для страниц.
+    
+    Даты разбираются один раз при построении: epoch (секунды), локальный день
+    (date.toordinal()), день недели (0 = понедельник), а section_id и project_id
+    заменяются целочисленными кодами. Индексы массивов совпадают с индексами items.
+    """
+    
+    EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+    
+    def __init__(self, items, time_field):
+        import numpy as np
+        
+        self.items = items
+        count = len(items)
+        values = [item.get(time_field) or '' for item in items]
+        
+        self.has_time = np.fromiter((bool(value) for value in values), dtype=bool, count=count)
+        self.epoch = np.zeros(count, dtype=np.float64)
+        self.day = np.zeros(count, dtype=np.int32)
+        self.weekday = np.zeros(count, dtype=np.int8)
+        
+        try:
+            self.parse_vectorized(values)
+        except ValueError:
+            # Нестандартный формат даты - разбираем построчно
+            self.parse_each(values)
+        
+        section_codes = {}
+        project_codes = {}
+        self.section_code = np.fromiter(
+            (section_codes.setdefault(item.get('section_id'), len(section_codes)) for item in items),
+            dtype=np.int32, count=count
+        )
+        self.project_code = np.fromiter(
+            (project_codes.setdefault(str(item.get('project_id')), len(project_codes)) for item in items),
+            dtype=np.int32, count=count
+        )
+        
+        # Код -> исходный идентификатор
+        self.section_ids = list(section_codes)
+        self.project_ids = list(project_codes)
+    
+    def parse_vectorized(self, values):
+        """Разобрать даты вида 'YYYY-MM-DDTHH:MM:SS...Z' средствами NumPy"""
+        import numpy as np
+        
+        if any(value and not value.endswith('Z') for value in values):
+            raise ValueError("дата не в UTC")
+        
+        stamps = np.array([value[:19] if value else 'NaT' for value in values], dtype='datetime64[s]')
+        epoch = np.where(self.has_time, stamps.astype(np.int64), 0)
+        
+        # Смещение местного времени считается один раз на сутки UTC; только в сутки
+        # перехода на летнее время (смещение на границах суток разное) - по часам
+        days, inverse = np.unique(epoch // 86400, return_inverse=True)
+        inverse = inverse.reshape(epoch.shape)
+        day_offsets = np.array([local_utc_offset(int(day) * 86400) for day in days], dtype=np.int64)
+        next_offsets = np.array([local_utc_offset((int(day) + 1) * 86400) for day in days], dtype=np.int64)
+        offsets = day_offsets[inverse]
+        
+        for day_index in np.flatnonzero(day_offsets != next_offsets):
+            in_day = inverse == day_index
+            offsets[in_day] = [local_utc_offset(int(hour) * 3600) for hour in epoch[in_day] // 3600]
+        
+        local_days = (epoch + offsets) // 86400 + self.EPOCH_ORDINAL
+        
+        self.epoch = epoch.astype(np.float64)
+        self.day = np.where(self.has_time, local_days, 0).astype(np.int32)
+        self.weekday = ((self.day - 1) % 7).astype(np.int8)
+    
+    def parse_each(self, values):
+        """Построчный разбор через кэшируемый timestamp_parts"""
+        for i, value in enumerate(values):
+            if not value:
+                continue
+            try:
+                self.epoch[i], self.day[i], self.weekday[i] = timestamp_parts(value)
+            except (ValueError, AttributeError):
+                self.has_time[i] = False
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def select(self, mask):
+        """Задачи, для которых mask истинна"""
+        import numpy as np
+        
+        return [self.items[i] for i in np.flatnonzero(mask)]
+
+
+COLUMN_TIME_FIELDS = {
+    'all_completed': 'completed_at',
+    'active_tasks': 'created_at'
+}
+
+
+def data_columns(data, key):
+    """Колонки списка задач из набора данных; строятся при первом обращении"""
+    columns = data.setdefault('columns', {})
+    if key not in columns:
+        columns[key] = TaskColumns(data.get(key, []), COLUMN_TIME_FIELDS[key])
+    return columns[key]
+
+
+WEEKDAY_NAMES = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
+
+
+@dataclass
+class DashboardMetrics:
+    """Показатели, из которых рисуются страницы аналитики"""
+    today: date
+    weekday_counts: dict  # {'Пн': n, ...} за текущую неделю
+    week_total: int
+    month_total: int
+    calendar_counts: dict  # {date: n} за текущий месяц
+    section_counts: dict  # {название раздела: n} выполненных в проекте за месяц
+    top_sections: list  # [(название раздела, n)] - три лучших
+    
+    def fingerprint(self):
+        """Отпечаток показателей (ключи календаря - даты, поэтому приводятся к строкам)"""
+        return content_fingerprint(
+            self.today.isoformat(), self.weekday_counts, self.week_total, self.month_total,
+            sorted((day.isoformat(), count) for day, count in self.calendar_counts.items()),
+            self.section_counts, self.top_sections
+        )
+
+
+def compute_metrics(columns, project_id, sections_dict, today=None):
+    """Посчитать все показатели страниц за один векторный проход по колонкам.
+    
+    Один np.bincount по номерам дней дает и столбцы по дням недели, и итоги
+    недели/месяца, и тепловую карту календаря; второй - счетчики по разделам.
+    """
+    import numpy as np
+    
+    today = today or date.today()
+    today_ordinal = today.toordinal()
+    week_start = today_ordinal - today.weekday()
+    month_start = today.replace(day=1).toordinal()
+    next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1).toordinal()
+    
+    first = min(week_start, month_start)
+    span = max(next_month, week_start + 7) - first
+    
+    offsets = columns.day - first
+    in_range = columns.has_time & (offsets >= 0) & (offsets < span)
+    day_counts = np.bincount(offsets[in_range], minlength=span)
+    
+    week = day_counts[week_start - first:week_start - first + 7]
+    month = day_counts[month_start - first:next_month - first]
+    
+    project_id = str(project_id)
+    if project_id in columns.project_ids:
+        project_code = columns.project_ids.index(project_id)
+        month_mask = in_range & (columns.day >= month_start) & (columns.day < next_month)
+        project_mask = month_mask & (columns.project_code == project_code)
+        code_counts = np.bincount(columns.section_code[project_mask], minlength=len(columns.section_ids))
+    else:
+        code_counts = []
+    
+    section_counts = {}
+    for code, count in enumerate(code_counts):
+        if count:
+            section_name = sections_dict.get(columns.section_ids[code], 'Без раздела')
+            section_counts[section_name] = section_counts.get(section_name, 0) + int(count)
+    
+    return DashboardMetrics(
+        today=today,
+        weekday_counts={WEEKDAY_NAMES[i]: int(week[i]) for i in range(7)},
+        week_total=int(week.sum()),
+        month_total=int(month.sum()),
+        calendar_counts={
+            date.fromordinal(month_start + offset): int(count)
+            for offset, count in enumerate(month) if count
+        },
+        section_counts=section_counts,
+        top_sections=sorted(section_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+    )
+
+
+class AggregateStore:
+    """Счетчики выполненных задач, которые обновляются по изменениям.
+    
+    Каждая выполненная задача один раз раскладывается по локальному дню и
+    разделу; дальше счетчики меняются только на величину изменений. Неделя,
+    месяц и календарь собираются из счетчиков по дням на дату запроса, поэтому
+    смена дня, недели или месяца не требует пересчета истории.
+    """
+    
+    def __init__(self):
+        self.entries = {}  # id выполнения -> (день, project_id, section_id, task_id)
+        self.task_index = {}  # task_id -> set(id выполнения)
+        self.day_counts = Counter()  # день (ordinal) -> количество
+        self.section_month_counts = Counter()  # (project_id, section_id, месяц) -> количество
     
     @staticmethod
-    def save(data):
-        """Сохранить данные в кэш"""
+    def month_key(day):
+        month_date = date.fromordinal(day)
+        return month_date.year * 12 + month_date.month - 1
+    
+    def add(self, item):
+        """Учесть выполненную задачу"""
+        completion_id = str(item['id'])
+        if completion_id in self.entries:
+            return
         try:
-            cache_data = {
-                'timestamp': datetime.now().isoformat(),
-                'data': data
+            _, day, _ = timestamp_parts(item['completed_at'])
+        except (KeyError, ValueError, AttributeError):
+            return
+        
+        entry = (day, str(item.get('project_id')), item.get('section_id'), str(item.get('task_id')))
+        self.entries[completion_id] = entry
+        self.task_index.setdefault(entry[3], set()).add(completion_id)
+        self.day_counts[day] += 1
+        self.section_month_counts[(entry[1], entry[2], self.month_key(day))] += 1
+    
+    def remove(self, completion_id):
+        """Убрать выполненную задачу (отменена или удалена)"""
+        entry = self.entries.pop(completion_id, None)
+        if entry is None:
+            return
+        day, project_id, section_id, task_id = entry
+        
+        self.decrement(self.day_counts, day)
+        self.decrement(self.section_month_counts, (project_id, section_id, self.month_key(day)))
+        completions = self.task_index.get(task_id)
+        if completions is not None:
+            completions.discard(completion_id)
+            if not completions:
+                del self.task_index[task_id]
+    
+    def move_section(self, completion_id, section_id):
+        """Перенести выполненную задачу в другой раздел"""
+        entry = self.entries.get(completion_id)
+        if entry is None or entry[2] == section_id:
+            return
+        day, project_id, old_section_id, task_id = entry
+        month = self.month_key(day)
+        
+        self.decrement(self.section_month_counts, (project_id, old_section_id, month))
+        self.section_month_counts[(project_id, section_id, month)] += 1
+        self.entries[completion_id] = (day, project_id, section_id, task_id)
+    
+    def prune(self, min_day):
+        """Забыть задачи, выполненные раньше min_day (окно страниц сдвинулось)"""
+        for completion_id, entry in list(self.entries.items()):
+            if entry[0] < min_day:
+                self.remove(completion_id)
+    
+    def completions_for_task(self, task_id):
+        return set(self.task_index.get(str(task_id), ()))
+    
+    @staticmethod
+    def decrement(counter, key):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+    
+    def metrics(self, project_id, sections_dict, today=None):
+        """Показатели страниц на дату today из поддерживаемых счетчиков"""
+        today = today or date.today()
+        week_start = today.toordinal() - today.weekday()
+        month_start = today.replace(day=1).toordinal()
+        next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1).toordinal()
+        current_month = self.month_key(month_start)
+        
+        week = [self.day_counts.get(week_start + i, 0) for i in range(7)]
+        calendar_counts = {
+            date.fromordinal(day): self.day_counts[day]
+            for day in range(month_start, next_month) if self.day_counts.get(day)
+        }
+        
+        project_id = str(project_id)
+        section_counts = {}
+        for (task_project_id, section_id, month), count in self.section_month_counts.items():
+            if task_project_id == project_id and month == current_month:
+                section_name = sections_dict.get(section_id, 'Без раздела')
+                section_counts[section_name] = section_counts.get(section_name, 0) + count
+        
+        return DashboardMetrics(
+            today=today,
+            weekday_counts={WEEKDAY_NAMES[i]: week[i] for i in range(7)},
+            week_total=sum(week),
+            month_total=sum(calendar_counts.values()),
+            calendar_counts=calendar_counts,
+            section_counts=section_counts,
+            top_sections=sorted(section_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+        )
+
+
+def content_fingerprint(*parts):
+    """Отпечаток содержимого: совпадает, только если данные не изменились"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def set_update_time(label, data):
+    """Показать время обновления данных"""
+    timestamp = data.get('timestamp', '')
+    if timestamp:
+        dt = datetime.fromisoformat(timestamp)
+        label.setText(f'Обновлено: {dt.strftime("%H:%M:%S")}')
+    else:
+        current_time = QtCore.QDateTime.currentDateTime().toString('hh:mm:ss')
+        label.setText(f'Обновлено: {current_time}')
+
+
+def prepare_dataset(data, project_id, metrics=None):
+    """Подготовить набор данных для страниц: колонки и показатели.
+    
+    Если показатели уже посчитаны (AggregateStore), колонки истории не строятся.
+    """
+    data['project_id'] = str(project_id)
+    data_columns(data, 'active_tasks')
+    if metrics is None:
+        metrics = compute_metrics(data_columns(data, 'all_completed'), project_id, data.get('sections', {}))
+    data['metrics'] = metrics
+    # Время загрузки в отпечаток не входит - иначе он менялся бы на каждом обновлении
+    data['fingerprint'] = content_fingerprint(
+        data['project_id'], data.get('sections', {}), data.get('active_tasks', []), metrics.fingerprint()
+    )
+    return data
+
+
+def data_metrics(data):
+    """Показатели набора данных; считаются на месте, если загрузчик их не добавил"""
+    if 'metrics' not in data:
+        data['metrics'] = compute_metrics(
+            data_columns(data, 'all_completed'), data.get('project_id'), data.get('sections', {})
+        )
+    return data['metrics']
+
+
+class FetchCancelled(Exception):
+    """Загрузка прервана: параллельный запрос завершился ошибкой или загрузчик остановлен"""
+
+
+def run_concurrently(jobs, max_workers=LOADER_MAX_WORKERS, cancel_event=None):
+    """Выполнить независимые загрузки параллельно.
+    
+    jobs - словарь {имя: функция(cancel_event)}. Если одна из функций падает,
+    еще не начатые отменяются, а выполняющиеся получают cancel_event и
+    прерываются на ближайшей проверке. Первая ошибка пробрасывается наружу.
+    Внешний cancel_event позволяет вложить параллельную загрузку в другую.
+    """
+    if cancel_event is None:
+        cancel_event = threading.Event()
+    results = {}
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+        # Задачи выполняются в копии контекста вызывающего: так до них доходит счетчик запросов
+        futures = {
+            executor.submit(contextvars.copy_context().run, job, cancel_event): name
+            for name, job in jobs.items()
+        }
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        
+        failed = [f for f in done if f.exception() is not None]
+        if failed:
+            cancel_event.set()
+            for future in pending:
+                future.cancel()
+            raise failed[0].exception()
+        
+        for future in done:
+            results[futures[future]] = future.result()
+    
+    return results
+
+
+class StoreWriter(threading.Thread):
+    """Фоновая запись в LocalStore с задержкой (write-behind).
+    
+    Операции копятся STORE_WRITE_DELAY секунд и записываются одной транзакцией,
+    поэтому загрузчик не ждет диска перед отправкой данных в интерфейс.
+    """
+    
+    def __init__(self, store, delay=STORE_WRITE_DELAY):
+        super().__init__(daemon=True)
+        self.store = store
+        self.delay = delay
+        self.pending = []
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+    
+    def enqueue(self, operation):
+        """Добавить операцию operation(conn) в очередь записи"""
+        with self.condition:
+            self.pending.append(operation)
+            self.condition.notify()
+    
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+            # Даем накопиться изменениям, пришедшим в этом же цикле загрузки
+            time.sleep(self.delay)
+            self.flush()
+    
+    def flush(self):
+        """Записать накопленные операции одной транзакцией"""
+        with self.write_lock:
+            with self.condition:
+                operations, self.pending = self.pending, []
+            if not operations:
+                return
+            try:
+                with self.store.transaction() as conn:
+                    for operation in operations:
+                        operation(conn)
+                    self.store.set_meta(conn, 'saved_at', datetime.now().isoformat())
+                print(f"💾 Хранилище обновлено ({len(operations)} изм.): {datetime.now().strftime('%H:%M:%S')}")
+            except Exception as e:
+                print(f"❌ Ошибка записи в хранилище: {e}")
+
+
+class LocalStore:
+    """Локальное хранилище SQLite: разделы, активные и выполненные задачи.
+    
+    Синхронизация записывает только изменившиеся строки; страницы и стартовая
+    загрузка читают данные запросами по индексам, не разбирая всю историю.
+    Строки хранятся в компактном виде: только поля, нужные дашборду, без ключей.
+    """
+    
+    SCHEMA_VERSION = 2
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS sections (
+            id TEXT PRIMARY KEY,
+            project_id TEXT,
+            name TEXT,
+            payload BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sections_project ON sections(project_id);
+        CREATE TABLE IF NOT EXISTS active_tasks (
+            id TEXT PRIMARY KEY,
+            project_id TEXT,
+            section_id TEXT,
+            created_at TEXT,
+            payload BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_active_project ON active_tasks(project_id);
+        CREATE INDEX IF NOT EXISTS idx_active_section ON active_tasks(section_id);
+        CREATE TABLE IF NOT EXISTS completed_tasks (
+            id TEXT PRIMARY KEY,
+            task_id TEXT,
+            project_id TEXT,
+            section_id TEXT,
+            completed_at TEXT NOT NULL,
+            payload BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_completed_at ON completed_tasks(completed_at);
+        CREATE INDEX IF NOT EXISTS idx_completed_project ON completed_tasks(project_id, completed_at);
+        CREATE INDEX IF NOT EXISTS idx_completed_section ON completed_tasks(section_id);
+        CREATE TABLE IF NOT EXISTS outbox (
+            uuid TEXT PRIMARY KEY,
+            task_key TEXT NOT NULL UNIQUE,
+            args TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            task_id TEXT,
+            temp_id TEXT,
+            rejections INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox(status, next_attempt_at);
+    """
+    
+    # Поля, которые используют страницы; порядок задает формат записи
+    RECORD_FIELDS = {
+        'sections': ('id', 'name', 'project_id', 'section_order'),
+        'active_tasks': ('id', 'content', 'project_id', 'section_id', 'priority', 'created_at', 'child_order'),
+        'completed_tasks': ('id', 'task_id', 'content', 'project_id', 'section_id', 'completed_at')
+    }
+    
+    def __init__(self, path=STORE_DB_FILE):
+        self.path = path
+        self.snapshot_key = None  # Отпечаток последнего сохраненного снимка страниц
+        with self.transaction() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.migrate(conn)
+        self.writer = StoreWriter(self)
+        self.writer.start()
+    
+    @contextmanager
+    def transaction(self):
+        """Соединение на время одной транзакции (безопасно для разных потоков)"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def migrate(self, conn):
+        """Создать схему или обновить хранилище предыдущей версии"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        has_tables = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'completed_tasks'"
+        ).fetchone() is not None
+        
+        conn.executescript(self.SCHEMA)
+        
+        outbox_columns = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+        if 'temp_id' not in outbox_columns:
+            # Очередь первой версии не хранила temp_id команды
+            conn.execute("ALTER TABLE outbox ADD COLUMN temp_id TEXT")
+            conn.execute("UPDATE outbox SET temp_id = lower(hex(randomblob(16)))")
+        if 'rejections' not in outbox_columns:
+            # Раньше сбои сети тоже исчерпывали попытки - такие задачи отправляются снова
+            conn.execute("ALTER TABLE outbox ADD COLUMN rejections INTEGER NOT NULL DEFAULT 0")
+            conn.execute("UPDATE outbox SET status = 'pending', next_attempt_at = 0 WHERE status = 'failed'")
+        
+        if has_tables and version < 2:
+            # Версия 1 хранила задачи полным JSON-текстом
+            print("🔧 Перевод хранилища на компактный формат записей")
+            for table in self.RECORD_FIELDS:
+                rows = conn.execute(f"SELECT id, payload FROM {table}").fetchall()
+                conn.executemany(
+                    f"UPDATE {table} SET payload = ? WHERE id = ?",
+                    [(self.encode(table, json.loads(payload)), row_id) for row_id, payload in rows]
+                )
+        
+        version_byte = bytes([self.SCHEMA_VERSION])
+        if any(
+            conn.execute(f"SELECT 1 FROM {table} WHERE substr(payload, 1, 1) != ? LIMIT 1", (version_byte,)).fetchone()
+            for table in self.RECORD_FIELDS
+        ):
+            # Записи неизвестного формата (например, от более новой версии) не читаются:
+            # данные удаляются, следующая синхронизация будет полной
+            print("⚠️ Хранилище в неизвестном формате, данные будут загружены заново")
+            for table in self.RECORD_FIELDS:
+                conn.execute(f"DELETE FROM {table}")
+            conn.execute(
+                "DELETE FROM meta WHERE key IN ('sync_tokens', 'sync_token', 'completed_newest_at', "
+                "'completed_newest_ids', 'view_snapshot', 'saved_at')"
+            )
+        
+        conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+    
+    @classmethod
+    def encode(cls, table, item):
+        """Компактная запись: версия формата + JSON-массив значений в порядке RECORD_FIELDS"""
+        values = [item.get(field) for field in cls.RECORD_FIELDS[table]]
+        return bytes([cls.SCHEMA_VERSION]) + json.dumps(
+            values, ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+    
+    @classmethod
+    def decode(cls, table, payload):
+        if payload[0] != cls.SCHEMA_VERSION:
+            raise ValueError(f"неизвестная версия записи {payload[0]} в {table}")
+        values = json.loads(bytes(payload[1:]).decode('utf-8'))
+        # Отсутствующие поля не восстанавливаются, чтобы работали значения по умолчанию в .get()
+        return {field: value for field, value in zip(cls.RECORD_FIELDS[table], values) if value is not None}
+    
+    def flush(self):
+        """Немедленно записать отложенные изменения (например, при выходе)"""
+        self.writer.flush()
+    
+    # ---------- meta ----------
+    
+    def get_meta(self, key, default=None):
+        with self.transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+    
+    @staticmethod
+    def set_meta(conn, key, value):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value))
+        )
+    
+    # ---------- очередь создания задач ----------
+    
+    def add_to_outbox(self, entries):
+        """Записать задачи в очередь создания до отправки.
+        
+        entries - [(ключ события, аргументы item_add)]. Ключ уникален: задача,
+        которая уже стоит в очереди или создана, второй раз не добавляется.
+        uuid и temp_id записи - uuid и temp_id команды Sync API, они не меняются
+        между повторами. Возвращает количество добавленных.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO outbox (uuid, task_key, args, created_at, temp_id) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (str(uuid.uuid4()), task_key, json.dumps(args, ensure_ascii=False), now, str(uuid.uuid4()))
+                    for task_key, args in entries
+                ]
+            )
+            return cursor.rowcount
+    
+    def outbox_due(self):
+        """Неотправленные задачи, время повтора которых наступило"""
+        with self.transaction() as conn:
+            rows = conn.execute(
+                "SELECT uuid, task_key, args, attempts, temp_id, rejections FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY created_at",
+                (time.time(),)
+            ).fetchall()
+        return [
+            {
+                'uuid': row[0], 'task_key': row[1], 'args': json.loads(row[2]),
+                'attempts': row[3], 'temp_id': row[4], 'rejections': row[5]
             }
-            with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-            print(f"💾 Кэш сохранен: {datetime.now().strftime('%H:%M:%S')}")
+            for row in rows
+        ]
+    
+    def finish_outbox(self, done, failed):
+        """Отметить результат отправки одной транзакцией.
+        
+        done - [(uuid, id задачи или None, если он неизвестен)]; failed - [(запись
+        outbox_due, отклонена ли команда сервером)]. Повтор откладывается
+        экспоненциально (не дольше OUTBOX_MAX_BACKOFF). Запись помечается как failed
+        только после OUTBOX_MAX_ATTEMPTS отказов сервера: сбой сети или 5xx не
+        значит, что задачу нельзя создать, такая запись ждет сколько угодно.
+        Возвращает [(статус, отказов)] в порядке failed.
+        """
+        now = time.time()
+        failed_rows = []
+        for entry, rejected in failed:
+            attempts = entry['attempts'] + 1
+            rejections = entry['rejections'] + int(rejected)
+            delay = min(OUTBOX_BACKOFF_BASE * (2 ** (attempts - 1)), OUTBOX_MAX_BACKOFF)
+            status = 'failed' if rejections >= OUTBOX_MAX_ATTEMPTS else 'pending'
+            failed_rows.append((status, attempts, rejections, now + delay, entry['uuid']))
+        
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE outbox SET status = 'done', task_id = ? WHERE uuid = ?",
+                [(task_id and str(task_id), command_uuid) for command_uuid, task_id in done]
+            )
+            conn.executemany(
+                "UPDATE outbox SET status = ?, attempts = ?, rejections = ?, next_attempt_at = ? WHERE uuid = ?",
+                failed_rows
+            )
+        return [(status, rejections) for status, _, rejections, _, _ in failed_rows]
+    
+    def outbox_next_attempt(self):
+        """Время (time.time()) ближайшего повтора неотправленной задачи или None"""
+        with self.transaction() as conn:
+            row = conn.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'").fetchone()
+        return row[0]
+    
+    def prune_outbox(self, before):
+        """Удалить завершенные записи очереди старше before (time.time())"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM outbox WHERE status != 'pending' AND created_at < ?", (before,))
+    
+    # ---------- синхронизация ----------
+    
+    def load_sync_state(self):
+        """Вернуть ({тип ресурса: sync_token}, задачи, разделы) для SyncEngine"""
+        with self.transaction() as conn:
+            items = {
+                row[0]: self.decode('active_tasks', row[1])
+                for row in conn.execute("SELECT id, payload FROM active_tasks")
+            }
+            sections = {
+                row[0]: self.decode('sections', row[1])
+                for row in conn.execute("SELECT id, payload FROM sections")
+            }
+            tokens_row = conn.execute("SELECT value FROM meta WHERE key = 'sync_tokens'").fetchone()
+            row = conn.execute("SELECT value FROM meta WHERE key = 'sync_token'").fetchone()
+        if tokens_row:
+            sync_tokens = json.loads(tokens_row[0])
+        else:
+            # Хранилище до раздельных токенов: общий токен подходит всем типам ресурсов
+            sync_token = json.loads(row[0]) if row else '*'
+            sync_tokens = {resource: sync_token for resource in SYNC_RESOURCE_TYPES}
+        return sync_tokens, items, sections
+    
+    def save_sync_changes(self, sync_tokens, items, deleted_item_ids, sections, deleted_section_ids, full_types=()):
+        """Поставить в очередь изменения модели вместе с sync_token каждого типа ресурсов.
+        
+        full_types - типы, пришедшие полной синхронизацией: их таблицы заменяются целиком.
+        Строки, запись которых не изменилась, не перезаписываются. Если изменений
+        нет, запись не выполняется: старый sync_token вернет те же (пустые) изменения.
+        """
+        if not (full_types or items or deleted_item_ids or sections or deleted_section_ids):
+            return
+        sync_tokens = dict(sync_tokens)
+        
+        task_rows = [
+            (str(item['id']), str(item.get('project_id')), item.get('section_id'),
+             item.get('created_at'), self.encode('active_tasks', item))
+            for item in items
+        ]
+        section_rows = [
+            (str(section['id']), str(section.get('project_id')), section.get('name'),
+             self.encode('sections', section))
+            for section in sections
+        ]
+        
+        def operation(conn):
+            if 'items' in full_types:
+                conn.execute("DELETE FROM active_tasks")
+            if 'sections' in full_types:
+                conn.execute("DELETE FROM sections")
+            
+            conn.executemany(
+                "INSERT INTO active_tasks (id, project_id, section_id, created_at, payload) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET project_id = excluded.project_id, "
+                "section_id = excluded.section_id, created_at = excluded.created_at, "
+                "payload = excluded.payload WHERE payload != excluded.payload",
+                task_rows
+            )
+            conn.executemany("DELETE FROM active_tasks WHERE id = ?", [(i,) for i in deleted_item_ids])
+            
+            conn.executemany(
+                "INSERT INTO sections (id, project_id, name, payload) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET project_id = excluded.project_id, "
+                "name = excluded.name, payload = excluded.payload "
+                "WHERE payload != excluded.payload",
+                section_rows
+            )
+            conn.executemany("DELETE FROM sections WHERE id = ?", [(i,) for i in deleted_section_ids])
+            
+            self.set_meta(conn, 'sync_tokens', sync_tokens)
+        
+        self.writer.enqueue(operation)
+    
+    # ---------- выполненные задачи ----------
+    
+    def add_completed(self, items, newest_completed_at, newest_ids):
+        """Поставить в очередь добавление выполненных задач и новую отметку"""
+        rows = [
+            (str(item['id']), str(item.get('task_id')), str(item.get('project_id')),
+             item.get('section_id'), item['completed_at'], self.encode('completed_tasks', item))
+            for item in items
+        ]
+        
+        def operation(conn):
+            conn.executemany(
+                "INSERT OR IGNORE INTO completed_tasks "
+                "(id, task_id, project_id, section_id, completed_at, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.set_meta(conn, 'completed_newest_at', newest_completed_at)
+            self.set_meta(conn, 'completed_newest_ids', newest_ids)
+        
+        self.writer.enqueue(operation)
+    
+    def delete_completed(self, completion_ids):
+        """Поставить в очередь удаление выполненных задач по id"""
+        rows = [(str(completion_id),) for completion_id in completion_ids]
+        self.writer.enqueue(lambda conn: conn.executemany("DELETE FROM completed_tasks WHERE id = ?", rows))
+    
+    def update_completed(self, items):
+        """Поставить в очередь перезапись выполненных задач (например, после переноса раздела)"""
+        rows = [
+            (str(item['id']), str(item.get('task_id')), str(item.get('project_id')),
+             item.get('section_id'), item['completed_at'], self.encode('completed_tasks', item))
+            for item in items
+        ]
+        self.writer.enqueue(lambda conn: conn.executemany(
+            "INSERT OR REPLACE INTO completed_tasks "
+            "(id, task_id, project_id, section_id, completed_at, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        ))
+    
+    def delete_completed_before(self, completed_at):
+        """Поставить в очередь удаление выполненных задач старше отметки"""
+        self.writer.enqueue(
+            lambda conn: conn.execute("DELETE FROM completed_tasks WHERE completed_at < ?", (completed_at,))
+        )
+    
+    # ---------- перенос старого JSON-кэша ----------
+    
+    def import_legacy_cache(self, cache_file, project_id):
+        """Перенести данные из старого todoist_cache.json, если хранилище еще пустое.
+        
+        Разделы и активные задачи заменит первая полная синхронизация, а
+        выполненные задачи сразу становятся историей с отметкой completed_at,
+        поэтому полный обход истории после обновления не нужен.
+        """
+        if not os.path.exists(cache_file) or self.get_meta('saved_at') is not None:
+            return
+        
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f).get('data') or {}
+            
+            sections = [
+                {'id': section_id, 'name': name, 'project_id': project_id}
+                for section_id, name in data.get('sections', {}).items()
+            ]
+            active_tasks = data.get('active_tasks', [])
+            completed = [item for item in data.get('all_completed', []) if item.get('completed_at')]
+            
+            # Задачи без id не восстановить как строки хранилища
+            active_tasks = [task for task in active_tasks if task.get('id')]
+            completed = [item for item in completed if item.get('id')]
+            
+            self.save_sync_changes(
+                {resource: '*' for resource in SYNC_RESOURCE_TYPES},
+                active_tasks, [], sections, [], full_types=SYNC_RESOURCE_TYPES
+            )
+            if completed:
+                newest_at = max(item['completed_at'] for item in completed)
+                newest_ids = [str(item['id']) for item in completed if item['completed_at'] == newest_at]
+                self.add_completed(completed, newest_at, newest_ids)
+            self.flush()
+            
+            os.replace(cache_file, f"{cache_file}.migrated")
+            print(f"📦 Старый кэш перенесен в хранилище ({len(completed)} выполненных задач)")
         except Exception as e:
-            print(f"❌ Ошибка сохранения кэша: {e}")
+            print(f"❌ Ошибка переноса старого кэша: {e}")
     
-    @staticmethod
-    def load():
-        """Загрузить данные из кэша"""
+    # ---------- запросы для страниц ----------
+    
+    def get_sections(self, project_id):
+        with self.transaction() as conn:
+            rows = conn.execute("SELECT payload FROM sections WHERE project_id = ?", (str(project_id),))
+            sections = [self.decode('sections', row[0]) for row in rows]
+        sections.sort(key=lambda s: s.get('section_order') or 0)
+        return sections
+    
+    def get_active_tasks(self, project_id):
+        with self.transaction() as conn:
+            rows = conn.execute("SELECT payload FROM active_tasks WHERE project_id = ?", (str(project_id),))
+            tasks = [self.decode('active_tasks', row[0]) for row in rows]
+        tasks.sort(key=lambda t: t.get('child_order') or 0)
+        return tasks
+    
+    def get_completed(self, project_id=None, since=None, until=None):
+        """Выполненные задачи (самые новые первыми) с фильтром по проекту и периоду.
+        
+        since, until - строки completed_at в формате Todoist (сравниваются по индексу).
+        """
+        query = "SELECT payload FROM completed_tasks WHERE 1 = 1"
+        params = []
+        if project_id is not None:
+            query += " AND project_id = ?"
+            params.append(str(project_id))
+        if since is not None:
+            query += " AND completed_at >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND completed_at < ?"
+            params.append(until)
+        query += " ORDER BY completed_at DESC"
+        
+        with self.transaction() as conn:
+            return [self.decode('completed_tasks', row[0]) for row in conn.execute(query, params)]
+    
+    # ---------- снимок моделей страниц ----------
+    
+    def load_snapshot(self, project_id):
+        """Снимок моделей страниц последней загрузки - для мгновенной первой отрисовки"""
+        snapshot = self.get_meta('view_snapshot')
+        if not snapshot or snapshot.get('project_id') != str(project_id):
+            return None
+        self.snapshot_key = content_fingerprint(snapshot['views'])
+        return snapshot
+    
+    def save_snapshot(self, data):
+        """Поставить в очередь сохранение моделей страниц, если они изменились"""
+        snapshot_key = content_fingerprint(data['views'])
+        if snapshot_key == self.snapshot_key:
+            return
+        self.snapshot_key = snapshot_key
+        
+        snapshot = {
+            'project_id': data['project_id'],
+            'timestamp': data.get('timestamp', ''),
+            'fingerprint': data.get('fingerprint'),
+            'views': data['views']
+        }
+        self.writer.enqueue(lambda conn: self.set_meta(conn, 'view_snapshot', snapshot))
+    
+    def load_dataset(self, project_id):
+        """Собрать набор данных для страниц из хранилища (без обращения к API)"""
+        since = format_todoist_datetime(dashboard_window_start())
+        sections = self.get_sections(project_id)
+        if not sections and self.get_meta('saved_at') is None:
+            return None
+        
+        return prepare_dataset({
+            'sections': {s['id']: s['name'] for s in sections},
+            'active_tasks': self.get_active_tasks(project_id),
+            'completed_tasks': self.get_completed(project_id=project_id, since=since),
+            'all_completed': self.get_completed(since=since),
+            'timestamp': self.get_meta('saved_at', '')
+        }, project_id)
+
+
+class SyncEngine:
+    """Локальная модель задач и разделов, обновляемая по sync_token.
+    
+    У каждого типа ресурсов свой sync_token: задачи можно синхронизировать
+    чаще разделов, не теряя изменений разделов между их синхронизациями.
+    """
+    
+    def __init__(self, api, store):
+        self.api = api
+        self.store = store
+        self.sync_tokens = {resource: '*' for resource in SYNC_RESOURCE_TYPES}
+        self.items = {}
+        self.sections = {}
+        self.last_item_changes = []  # Задачи из последнего ответа (в том числе выполненные и удаленные)
+        self.load_state()
+    
+    def load_state(self):
+        """Загрузить сохраненную модель и sync_token"""
         try:
-            if os.path.exists(CACHE_FILE):
-                with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                    timestamp = cache_data.get('timestamp', '')
-                    data = cache_data.get('data', None)
-                    
-                    if data:
-                        print(f"📂 Кэш загружен (сохранен: {timestamp})")
-                        return data
+            sync_tokens, self.items, self.sections = self.store.load_sync_state()
+            self.sync_tokens.update(sync_tokens)
+            if self.items:
+                print(f"📂 Модель синхронизации загружена ({len(self.items)} задач)")
         except Exception as e:
-            print(f"❌ Ошибка загрузки кэша: {e}")
+            print(f"❌ Ошибка загрузки модели синхронизации: {e}")
+            self.reset()
+    
+    def reset(self):
+        """Сбросить модель: следующая синхронизация будет полной"""
+        self.sync_tokens = {resource: '*' for resource in SYNC_RESOURCE_TYPES}
+        self.items = {}
+        self.sections = {}
+    
+    def sync(self, cancel_event=None, resource_types=None):
+        """Получить изменения с сервера и применить их к модели.
+        
+        resource_types - какие типы ресурсов синхронизировать (по умолчанию все);
+        типы с одинаковым sync_token запрашиваются одним запросом.
+        Возвращает True, если модель изменилась. Если cancel_event установлен
+        до применения ответа, модель остается нетронутой.
+        """
+        groups = {}
+        for resource in resource_types or SYNC_RESOURCE_TYPES:
+            groups.setdefault(self.sync_tokens[resource], []).append(resource)
+        
+        responses = [
+            (resources, self.request(sync_token, resources, cancel_event))
+            for sync_token, resources in groups.items()
+        ]
         
-        return None
+        if cancel_event is not None and cancel_event.is_set():
+            raise FetchCancelled()
+        
+        self.last_item_changes = []
+        changed = False
+        for resources, response in responses:
+            changed = self.apply(response, resources) or changed
+        return changed
+    
+    def request(self, sync_token, resource_types, cancel_event=None):
+        """Запрос изменений; при недействительном токене - полная синхронизация этих типов"""
+        try:
+            return self.api.sync(sync_token, resource_types, cancel_event)
+        except TodoistAPIError as e:
+            # Недействительный токен - единственный случай, когда нужна полная синхронизация
+            if sync_token == '*' or e.status_code not in (400, 410):
+                raise
+            print("⚠️ sync_token недействителен, выполняется полная синхронизация")
+            return self.api.sync('*', resource_types, cancel_event)
+    
+    def apply(self, response, resource_types=SYNC_RESOURCE_TYPES):
+        """Применить ответ Sync API (полный или инкрементальный) к модели и хранилищу"""
+        full = bool(response.get('full_sync'))
+        changed = full
+        
+        if full:
+            print(f"🔁 Полная синхронизация ({', '.join(resource_types)})")
+            if 'items' in resource_types:
+                self.items = {}
+            if 'sections' in resource_types:
+                self.sections = {}
+        
+        self.last_item_changes.extend(response.get('items', []))
+        updated_items, deleted_items = [], []
+        for item in response.get('items', []):
+            item_id = str(item['id'])
+            if item.get('is_deleted') or item.get('checked'):
+                if self.items.pop(item_id, None) is not None:
+                    deleted_items.append(item_id)
+            else:
+                # Sync API отдает дату создания как added_at, REST - как created_at
+                if 'created_at' not in item:
+                    item['created_at'] = item.get('added_at')
+                self.items[item_id] = item
+                updated_items.append(item)
+        
+        updated_sections, deleted_sections = [], []
+        for section in response.get('sections', []):
+            section_id = str(section['id'])
+            if section.get('is_deleted') or section.get('is_archived'):
+                if self.sections.pop(section_id, None) is not None:
+                    deleted_sections.append(section_id)
+            else:
+                self.sections[section_id] = section
+                updated_sections.append(section)
+        
+        for resource in resource_types:
+            self.sync_tokens[resource] = response.get('sync_token', self.sync_tokens[resource])
+        self.store.save_sync_changes(
+            self.sync_tokens, updated_items, deleted_items,
+            updated_sections, deleted_sections, full_types=resource_types if full else ()
+        )
+        
+        return changed or bool(updated_items or deleted_items or updated_sections or deleted_sections)
+    
+    def get_sections(self, project_id):
+        """Разделы проекта из локальной модели"""
+        sections = [s for s in self.sections.values() if str(s.get('project_id')) == str(project_id)]
+        sections.sort(key=lambda s: s.get('section_order', 0))
+        return sections
+    
+    def get_active_tasks(self, project_id):
+        """Активные задачи проекта из локальной модели"""
+        tasks = [t for t in self.items.values() if str(t.get('project_id')) == str(project_id)]
+        tasks.sort(key=lambda t: t.get('child_order', 0))
+        return tasks
+
+
+class CompletedTasksStore:
+    """История выполненных задач с отметкой самого нового completed_at.
+    
+    После первой полной загрузки у сервера запрашиваются только задачи,
+    выполненные позже сохраненной отметки. Полная история лежит в LocalStore,
+    в памяти держится только окно, которое показывают страницы.
+    """
+    
+    def __init__(self, api, store):
+        self.api = api
+        self.store = store
+        self.newest_completed_at = store.get_meta('completed_newest_at')
+        self.newest_ids = store.get_meta('completed_newest_ids', [])
+        self.window_start = format_todoist_datetime(dashboard_window_start())
+        self.recent = {
+            str(item['id']): item for item in store.get_completed(since=self.window_start)
+        }
+        self.rebuild_index()  # self.by_project - {project_id: {id: задача}} окна
+        
+        # Счетчики строятся из окна один раз, дальше меняются только по изменениям
+        self.aggregates = AggregateStore()
+        for item in self.recent.values():
+            self.aggregates.add(item)
+    
+    def refresh(self, cancel_event=None):
+        """Догрузить новые выполненные задачи; возвращает количество добавленных"""
+        if self.newest_completed_at:
+            since = parse_todoist_datetime(self.newest_completed_at)
+            new_items = self.api.get_all_completed_tasks(since=since, cancel_event=cancel_event)
+        else:
+            print("🔁 Полная загрузка истории выполненных задач")
+            until = datetime.now(timezone.utc)
+            since = until - timedelta(days=COMPLETED_HISTORY_DAYS)
+            new_items = self.api.get_completed_tasks_windowed(since, until, cancel_event=cancel_event)
+        
+        if cancel_event is not None and cancel_event.is_set():
+            raise FetchCancelled()
+        
+        added = self.merge(new_items)
+        self.trim()
+        if added:
+            print(f"📥 Выполненные задачи: +{added}")
+        return added
+    
+    def merge(self, new_items):
+        """Добавить задачи в историю, пропуская уже известные"""
+        new_items = [
+            item for item in new_items
+            if item.get('completed_at')
+            and str(item['id']) not in self.recent
+            and str(item['id']) not in self.newest_ids
+        ]
+        if not new_items:
+            return 0
+        
+        for item in new_items:
+            item_id = str(item['id'])
+            completed_at = item['completed_at']
+            if completed_at >= self.window_start:
+                self.recent[item_id] = item
+                self.by_project.setdefault(str(item.get('project_id')), {})[item_id] = item
+                self.aggregates.add(item)
+            if self.newest_completed_at is None or completed_at > self.newest_completed_at:
+                self.newest_completed_at = completed_at
+                self.newest_ids = [item_id]
+            elif completed_at == self.newest_completed_at:
+                self.newest_ids.append(item_id)
+        
+        self.store.add_completed(new_items, self.newest_completed_at, list(self.newest_ids))
+        return len(new_items)
+    
+    def trim(self):
+        """Сдвинуть окно страниц и удалить из хранилища задачи старше COMPLETED_HISTORY_DAYS"""
+        window_day = dashboard_window_day()
+        window_start = dashboard_window_start(window_day)
+        if format_todoist_datetime(window_start) != self.window_start:
+            self.window_start = format_todoist_datetime(window_start)
+            self.recent = {
+                item_id: item for item_id, item in self.recent.items()
+                if item['completed_at'] >= self.window_start
+            }
+            self.rebuild_index()
+            # Счетчики ведутся по локальным дням - граница тоже локальная
+            self.aggregates.prune(window_day.toordinal())
+            threshold = datetime.now(timezone.utc) - timedelta(days=COMPLETED_HISTORY_DAYS)
+            self.store.delete_completed_before(format_todoist_datetime(threshold))
+    
+    def apply_task_changes(self, changed_items):
+        """Применить изменения задач из Sync API к выполненным задачам окна.
+        
+        Задача снова активна (выполнение отменено) или удалена - выполнение
+        убирается; выполненная задача перенесена в другой раздел - переносится.
+        """
+        removed, moved = [], []
+        for item in changed_items:
+            completion_ids = self.aggregates.completions_for_task(item['id'])
+            if not completion_ids:
+                continue
+            
+            is_recurring = (item.get('due') or {}).get('is_recurring')
+            if item.get('is_deleted') or (not item.get('checked') and not is_recurring):
+                for completion_id in completion_ids:
+                    self.aggregates.remove(completion_id)
+                    completion = self.recent.pop(completion_id, None)
+                    if completion is not None:
+                        self.by_project.get(str(completion.get('project_id')), {}).pop(completion_id, None)
+                    removed.append(completion_id)
+            elif item.get('checked'):
+                for completion_id in completion_ids:
+                    completion = self.recent.get(completion_id)
+                    if completion is not None and completion.get('section_id') != item.get('section_id'):
+                        completion['section_id'] = item.get('section_id')
+                        self.aggregates.move_section(completion_id, item.get('section_id'))
+                        moved.append(completion)
+        
+        if removed:
+            self.store.delete_completed(removed)
+        if moved:
+            self.store.update_completed(moved)
+        if removed or moved:
+            print(f"🔀 Выполненные задачи: отменено/удалено {len(removed)}, перенесено {len(moved)}")
+    
+    def rebuild_index(self):
+        """Построить индекс окна по проектам заново"""
+        self.by_project = {}
+        for item_id, item in self.recent.items():
+            self.by_project.setdefault(str(item.get('project_id')), {})[item_id] = item
+    
+    def metrics(self, project_id, sections_dict):
+        """Показатели страниц из поддерживаемых счетчиков"""
+        return self.aggregates.metrics(project_id, sections_dict)
+    
+    def get_all(self):
+        """Выполненные задачи окна страниц, самые новые первыми"""
+        return sorted(self.recent.values(), key=lambda item: item['completed_at'], reverse=True)
+    
+    def get_for_project(self, project_id):
+        """Выполненные задачи одного проекта из индекса, самые новые первыми"""
+        items = self.by_project.get(str(project_id), {})
+        return sorted(items.values(), key=lambda item: item['completed_at'], reverse=True)
 
 
 class DataLoaderThread(QtCore.QThread):
@@ -100,20 +1387,84 @@ class DataLoaderThread(QtCore.QThread):
     data_loaded = QtCore.pyqtSignal(dict)
     error_occurred = QtCore.pyqtSignal(str)
     
-    def __init__(self, api, project_id):
+    def __init__(self, api, project_id, store, sync_engine=None, completed_store=None, emit_local=False,
+                 resources=None):
         super().__init__()
         self.api = api
         self.project_id = project_id
+        self.store = store
+        self.sync_engine = sync_engine
+        self.completed_store = completed_store
+        self.emit_local = emit_local  # Сначала показать данные хранилища (нет снимка страниц)
+        self.error = None  # Исключение неудачной загрузки - по нему планировщик выбирает паузу
+        # Ресурсы этого цикла (FetchPlanner); остальные берутся из локальных моделей
+        self.resources = set(resources) if resources is not None else set(FETCH_TTL)
+        # Запросы только этой загрузки: общий журнал замеров включает и создание задач
+        self.request_counter = RequestCounter()
+        self.cancel_event = threading.Event()
+    
+    def stop(self):
+        """Прервать загрузку (в том числе ожидание повтора) и дождаться потока"""
+        self.cancel_event.set()
+        self.wait()
+    
+    def open_store(self):
+        """Первый запуск: поднять модель синхронизации и историю из хранилища в этом потоке"""
+        self.store.import_legacy_cache(CACHE_FILE, self.project_id)
+        # Модели передаются окну только вместе: без одной из них следующие загрузки не работают
+        sync_engine = SyncEngine(self.api, self.store)
+        completed_store = CompletedTasksStore(self.api, self.store)
+        self.sync_engine, self.completed_store = sync_engine, completed_store
+        
+        if self.emit_local:
+            self.publish_local()
+    
+    def publish_local(self):
+        """Показать данные хранилища, посчитанные на сегодняшнюю дату"""
+        local_data = self.store.load_dataset(self.project_id)
+        if local_data:
+            self.publish(local_data)
+    
+    def publish(self, data):
+        """Посчитать модели страниц, сохранить снимок и отдать данные интерфейсу"""
+        data_views(data)
+        self.store.save_snapshot(data)
+        self.data_loaded.emit(data)
     
     def run(self):
         """Выполнить загрузку данных в фоновом потоке"""
+        first_load = self.sync_engine is None
         try:
-            print("🔄 Начало загрузки данных...")
+            print(f"🔄 Начало загрузки данных: {', '.join(sorted(self.resources))}")
+            started_at = time.time()
+            REQUEST_COUNTER.set(self.request_counter)
+            
+            if first_load:
+                self.open_store()
             
-            sections_dict = {s['id']: s['name'] for s in self.api.get_sections(self.project_id)}
-            active_tasks = self.api.get_active_tasks(self.project_id)
-            completed_tasks = self.api.get_completed_tasks(self.project_id)
-            all_completed = self.api.get_all_completed_tasks()
+            # Активные задачи и история выполненных не зависят друг от друга
+            sync_types = [resource for resource in SYNC_RESOURCE_TYPES if resource in self.resources]
+            fetches = {}
+            if sync_types:
+                fetches['sync'] = lambda cancel_event: self.sync_engine.sync(cancel_event, sync_types)
+            if 'completed' in self.resources:
+                fetches['completed'] = lambda cancel_event: self.completed_store.refresh(cancel_event)
+            run_concurrently(fetches, cancel_event=self.cancel_event)
+            
+            if 'items' in sync_types:
+                self.completed_store.apply_task_changes(self.sync_engine.last_item_changes)
+            
+            sections_dict = {s['id']: s['name'] for s in self.sync_engine.get_sections(self.project_id)}
+            active_tasks = self.sync_engine.get_active_tasks(self.project_id)
+            # Страницам нужны только текущие неделя и месяц - остальная история остается в хранилище
+            all_completed = self.completed_store.get_all()
+            completed_tasks = self.completed_store.get_for_project(self.project_id)
+            
+            http_stats = self.api.transport.timing_summary(since=started_at)
+            print(
+                f"⏱️ Запросов: {self.request_counter.count}, среднее {http_stats['avg_ms']:.0f} мс, "
+                f"максимум {http_stats['max_ms']:.0f} мс"
+            )
             
             data = {
                 'sections': sections_dict,
@@ -122,180 +1473,671 @@ class DataLoaderThread(QtCore.QThread):
                 'all_completed': all_completed,
                 'timestamp': datetime.now().isoformat()
             }
+            # Показатели берутся из счетчиков: стоимость зависит от объема изменений, а не истории
+            prepare_dataset(data, self.project_id, self.completed_store.metrics(self.project_id, sections_dict))
             
-            DataCache.save(data)
-            
-            self.data_loaded.emit(data)
+            self.publish(data)
             print("✅ Данные загружены успешно")
             
+        except FetchCancelled as e:
+            self.error = e
+            print("⏹️ Загрузка прервана")
         except Exception as e:
+            self.error = e
             error_msg = f"Ошибка загрузки: {str(e)}"
             print(f"❌ {error_msg}")
             self.error_occurred.emit(error_msg)
+            
+            if first_load and not self.emit_local:
+                # Показан только снимок - пересчитываем данные хранилища на сегодня
+                try:
+                    self.publish_local()
+                except Exception as local_error:
+                    print(f"❌ Ошибка чтения хранилища: {local_error}")
+
+
+class TodoistAPIError(Exception):
+    """Ошибка ответа Todoist API"""
+    def __init__(self, status_code, message='', retry_after=None):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RequestBudget:
+    """Учет запросов одного токена в скользящем окне лимита Todoist.
+    
+    Общий для всех клиентов с этим токеном в процессе. Ответ 429 блокирует бюджет
+    на Retry-After, поэтому планировщик обновлений узнает и об ограничении,
+    которое получили другие запросы (например, создание задач).
+    """
+    
+    registry = {}
+    registry_lock = threading.Lock()
+    
+    def __init__(self, limit=API_REQUEST_BUDGET, window=API_BUDGET_WINDOW):
+        self.limit = limit
+        self.window = window
+        self.requests = deque()  # Время отправки запросов за последнее окно
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def for_token(cls, api_token):
+        """Бюджет токена (один на процесс)"""
+        key = hashlib.blake2b(api_token.encode('utf-8'), digest_size=8).hexdigest()
+        with cls.registry_lock:
+            if key not in cls.registry:
+                cls.registry[key] = cls()
+            return cls.registry[key]
+    
+    def expire(self, now):
+        while self.requests and self.requests[0] <= now - self.window:
+            self.requests.popleft()
+    
+    def record(self):
+        """Отметить отправленный запрос"""
+        now = time.monotonic()
+        with self.lock:
+            self.expire(now)
+            self.requests.append(now)
+    
+    def block(self, seconds):
+        """Сервер ответил 429: не отправлять запросы seconds секунд"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+    
+    def used(self):
+        with self.lock:
+            self.expire(time.monotonic())
+            return len(self.requests)
+    
+    def delay_for(self, cost):
+        """Через сколько секунд можно отправить cost запросов, не выходя за лимит"""
+        now = time.monotonic()
+        with self.lock:
+            self.expire(now)
+            delay = max(self.blocked_until - now, 0.0)
+            overflow = len(self.requests) + cost - self.limit
+            if overflow > 0:
+                # Ждем, пока из окна выйдут самые старые запросы
+                index = min(overflow, len(self.requests)) - 1
+                delay = max(delay, self.requests[index] + self.window - now)
+            return delay
+
+
+class RequestCounter:
+    """Количество запросов (с повторами) одной загрузки данных"""
+    
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+    
+    def add(self):
+        with self.lock:
+            self.count += 1
+
+
+# Счетчик загрузки, которая выполняет запрос; задается загрузчиком для своего потока
+REQUEST_COUNTER = contextvars.ContextVar('REQUEST_COUNTER', default=None)
+
+
+class HttpTransport:
+    """Общий пул keep-alive соединений с таймаутами, повторами и замером времени"""
+    
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, headers, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 max_retries=HTTP_MAX_RETRIES, backoff_base=HTTP_BACKOFF_BASE,
+                 pool_size=HTTP_POOL_SIZE, budget=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.headers = headers
+        self.pool_size = pool_size
+        self.budget = budget or RequestBudget()
+        
+        # Сессия (и импорт requests) создается при первом запросе - обычно в потоке загрузчика
+        self.session = None
+        self.session_lock = threading.Lock()
+        
+        self.timings = deque(maxlen=200)
+        self.timings_lock = threading.Lock()
+    
+    def get_session(self):
+        """Пул соединений; создается один раз при первом запросе"""
+        with self.session_lock:
+            if self.session is None:
+                with STARTUP_PROFILE.measure('импорт requests'):
+                    import requests
+                
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update(self.headers)
+                session.headers['Accept-Encoding'] = 'gzip, deflate'
+                self.session = session
+            return self.session
+    
+    def request(self, method, url, idempotent=True, cancel_event=None, **kwargs):
+        """Выполнить запрос, повторяя его при сетевых ошибках, 429 и 5xx.
+        
+        Неидемпотентные запросы повторяются только при 429: сервер их не обработал.
+        При исчерпании попыток выбрасывается TodoistAPIError. cancel_event прерывает
+        ожидание перед повтором с FetchCancelled.
+        """
+        session = self.get_session()
+        import requests
+        
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        
+        while True:
+            start = time.perf_counter()
+            self.budget.record()
+            counter = REQUEST_COUNTER.get()
+            if counter is not None:
+                counter.add()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.record_timing(method, url, None, start, attempt)
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                print(f"⚠️ Сетевая ошибка ({e.__class__.__name__}), повтор через {delay:.1f} с")
+            else:
+                self.record_timing(method, url, response.status_code, start, attempt)
+                if response.status_code < 400:
+                    return response
+                
+                retry_after = self.parse_retry_after(response.headers.get('Retry-After'))
+                if response.status_code == 429:
+                    self.budget.block(retry_after if retry_after is not None else self.backoff_delay(attempt))
+                retryable = response.status_code == 429 or (
+                    idempotent and response.status_code in self.RETRY_STATUSES
+                )
+                if not retryable or attempt >= self.max_retries:
+                    raise TodoistAPIError(response.status_code, response.text, retry_after)
+                
+                delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+                delay = min(delay, HTTP_MAX_RETRY_DELAY)
+                print(f"⚠️ HTTP {response.status_code}, повтор через {delay:.1f} с")
+            
+            if cancel_event is None:
+                time.sleep(delay)
+            elif cancel_event.wait(delay):
+                raise FetchCancelled()
+            attempt += 1
+    
+    def backoff_delay(self, attempt):
+        """Экспоненциальная задержка перед повтором"""
+        return min(self.backoff_base * (2 ** attempt), HTTP_MAX_RETRY_DELAY)
+    
+    @staticmethod
+    def parse_retry_after(value):
+        """Retry-After в секундах (число или HTTP-дата)"""
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+        except (TypeError, ValueError):
+            return None
+    
+    def record_timing(self, method, url, status_code, start, attempt):
+        """Сохранить время выполнения запроса"""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        path = urlparse(url).path
+        with self.timings_lock:
+            self.timings.append({
+                'method': method,
+                'path': path,
+                'status': status_code,
+                'elapsed_ms': elapsed_ms,
+                'attempt': attempt,
+                'time': time.time()
+            })
+        if HTTP_LOG_TIMINGS:
+            print(f"⏱️ {method} {path} -> {status_code}: {elapsed_ms:.0f} мс")
+    
+    def timing_summary(self, since=None):
+        """Сводка по запросам: количество, среднее и максимальное время (мс)"""
+        with self.timings_lock:
+            timings = [t for t in self.timings if since is None or t['time'] >= since]
+        if not timings:
+            return {'count': 0, 'avg_ms': 0.0, 'max_ms': 0.0}
+        elapsed = [t['elapsed_ms'] for t in timings]
+        return {
+            'count': len(elapsed),
+            'avg_ms': sum(elapsed) / len(elapsed),
+            'max_ms': max(elapsed)
+        }
 
 
 class TodoistAPI:
-    def __init__(self, api_token):
+    def __init__(self, api_token, base_url=REST_API_URL, sync_url=SYNC_API_URL):
         self.api_token = api_token
-        self.base_url = "https://api.todoist.com/rest/v2"
+        self.base_url = base_url
+        self.sync_url = sync_url
         self.headers = {
             "Authorization": f"Bearer {api_token}"
         }
+        self.transport = HttpTransport(self.headers, budget=RequestBudget.for_token(api_token))
     
-    def get_sections(self, project_id):
-        """Получить все разделы проекта"""
-        response = requests.get(
-            f"{self.base_url}/sections?project_id={project_id}",
-            headers=self.headers
-        )
-        return response.json() if response.status_code == 200 else []
-    
-    def get_active_tasks(self, project_id):
-        """Получить активные задачи проекта"""
-        response = requests.get(
-            f"{self.base_url}/tasks?project_id={project_id}",
-            headers=self.headers,
-            timeout=30
+    def sync(self, sync_token='*', resource_types=None, cancel_event=None):
+        """Запрос к Sync API: полный при sync_token='*', иначе только изменения"""
+        response = self.transport.request(
+            'POST',
+            f"{self.sync_url}/sync",
+            cancel_event=cancel_event,
+            data={
+                "sync_token": sync_token,
+                "resource_types": json.dumps(resource_types or SYNC_RESOURCE_TYPES)
+            }
         )
-        return response.json() if response.status_code == 200 else []
+        return response.json()
     
-    def get_all_completed_tasks(self):
-        """Получить все выполненные задачи за последний год по всем проектам"""
-        sync_url = "https://api.todoist.com/sync/v9/completed/get_all"
+    def get_all_completed_tasks(self, since=None, until=None, cancel_event=None):
+        """Получить все выполненные задачи за последний год по всем проектам.
+        
+        since, until - datetime (UTC): границы периода выполнения (включительно).
+        cancel_event - threading.Event: прервать обход страниц с FetchCancelled.
+        """
+        sync_url = f"{self.sync_url}/completed/get_all"
         
-        one_year_ago = datetime.now(timezone.utc) - timedelta(days=365)
+        one_year_ago = datetime.now(timezone.utc) - timedelta(days=COMPLETED_HISTORY_DAYS)
         
         all_items = []
         offset = 0
         
         while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise FetchCancelled()
+            
             params = {
                 "limit": 200,
                 "offset": offset
             }
+            if since:
+                params["since"] = since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M')
+            if until:
+                params["until"] = until.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M')
             
-            response = requests.post(
-                sync_url, 
-                headers=self.headers,
-                json=params,
-                timeout=30
-            )
+            # Ошибка выбрасывается транспортом: неполная история не должна попасть в хранилище
+            response = self.transport.request('POST', sync_url, cancel_event=cancel_event, json=params)
+            items = response.json().get('items', [])
             
-            if response.status_code == 200:
-                data = response.json()
-                items = data.get('items', [])
-                
-                for item in items:
-                    completed_at = item.get('completed_at', '')
-                    if completed_at:
-                        try:
-                            completed_date = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
-                            if completed_date >= one_year_ago:
-                                all_items.append(item)
-                        except (ValueError, AttributeError):
-                            continue
-                
-                if len(items) < 200:
-                    break
-                
-                offset += 200
-            else:
-                print(f"Ошибка API: {response.status_code}, {response.text}")
+            for item in items:
+                completed_at = item.get('completed_at', '')
+                if completed_at:
+                    try:
+                        completed_date = parse_todoist_datetime(completed_at)
+                        if completed_date >= one_year_ago:
+                            all_items.append(item)
+                    except (ValueError, AttributeError):
+                        continue
+            
+            if len(items) < 200:
                 break
+            
+            offset += 200
         
         return all_items
     
-    def get_completed_tasks(self, project_id):
-        """Получить все выполненные задачи за последний год"""
-        sync_url = "https://api.todoist.com/sync/v9/completed/get_all"
+    def get_completed_tasks_windowed(self, since, until, window_days=COMPLETED_WINDOW_DAYS,
+                                     max_workers=COMPLETED_WINDOW_WORKERS, cancel_event=None):
+        """Загрузить выполненные задачи за период, разбив его на окна по времени.
+        
+        Окна загружаются параллельно; каждое окно закрыто сверху, поэтому задачи,
+        выполненные во время обхода, не сдвигают смещения страниц. Задачи на
+        границах окон попадают в оба соседних окна и отбрасываются по id.
+        """
+        windows = []
+        window_start = since
+        while window_start < until:
+            window_end = min(window_start + timedelta(days=window_days), until)
+            windows.append((window_start, window_end))
+            window_start = window_end
+        
+        jobs = {
+            f"{start:%Y-%m-%d}": (
+                lambda event, start=start, end=end:
+                    self.get_all_completed_tasks(since=start, until=end, cancel_event=event)
+            )
+            for start, end in windows
+        }
+        results = run_concurrently(jobs, max_workers=max_workers, cancel_event=cancel_event)
         
-        one_year_ago = datetime.now(timezone.utc) - timedelta(days=365)
+        items_by_id = {}
+        for items in results.values():
+            for item in items:
+                items_by_id[str(item['id'])] = item
         
-        all_items = []
-        offset = 0
-        
-        while True:
-            params = {
-                "project_id": project_id,
-                "limit": 200,
-                "offset": offset
-            }
+        return sorted(items_by_id.values(), key=lambda item: item['completed_at'], reverse=True)
+    
+    def create_tasks_batch(self, tasks, uuids=None, temp_ids=None):
+        """Создать несколько задач командами item_add Sync API.
+        
+        tasks - список словарей с аргументами item_add (content, project_id, due_string,
+        section_id). Команды отправляются пачками по SYNC_COMMANDS_LIMIT; у каждой
+        свой uuid, поэтому повтор запроса не создает задачу второй раз. uuids и temp_ids - 
+        сохраненные uuid и temp_id команд (очередь создания), чтобы это работало и между запусками.
+        Возвращает список той же длины: id созданной задачи, True - задача создана, но
+        сервер не вернул ее id (повтор уже выполненной команды), False - сервер отклонил
+        команду, None - ответа нет (сбой сети, 5xx, 429): команда не обработана.
+        """
+        results = [None] * len(tasks)
+        
+        for start in range(0, len(tasks), SYNC_COMMANDS_LIMIT):
+            chunk = range(start, min(start + SYNC_COMMANDS_LIMIT, len(tasks)))
+            commands = []
+            for index in chunk:
+                args = {key: value for key, value in tasks[index].items() if value}
+                commands.append({
+                    "type": "item_add",
+                    "uuid": uuids[index] if uuids else str(uuid.uuid4()),
+                    "temp_id": temp_ids[index] if temp_ids else str(uuid.uuid4()),
+                    "args": args
+                })
             
-            response = requests.post(
-                sync_url, 
-                headers=self.headers,
-                json=params,
-                timeout=30
-            )
+            try:
+                response = self.transport.request(
+                    'POST',
+                    f"{self.sync_url}/sync",
+                    data={"commands": json.dumps(commands)}
+                ).json()
+            except Exception as e:
+                print(f"❌ Ошибка пакетного создания задач ({len(commands)} шт.): {e}")
+                continue
             
-            if response.status_code == 200:
-                data = response.json()
-                items = data.get('items', [])
-                
-                for item in items:
-                    completed_at = item.get('completed_at', '')
-                    if completed_at:
-                        try:
-                            completed_date = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
-                            if completed_date >= one_year_ago:
-                                all_items.append(item)
-                        except (ValueError, AttributeError):
-                            continue
-                
-                if len(items) < 200:
-                    break
-                
-                offset += 200
-            else:
-                print(f"Ошибка API: {response.status_code}, {response.text}")
-                break
+            sync_status = response.get('sync_status', {})
+            temp_id_mapping = response.get('temp_id_mapping', {})
+            for index, command in zip(chunk, commands):
+                status = sync_status.get(command['uuid'])
+                if status == 'ok':
+                    # Задача создана, даже если сервер не вернул ее id - повторять нельзя
+                    results[index] = temp_id_mapping.get(command['temp_id']) or True
+                elif status is not None:
+                    results[index] = False
+                    print(f"❌ Ошибка создания задачи «{tasks[index].get('content')}»: {status}")
+        
+        return results
+
+
+# Цвета секторов круговой диаграммы
+PIE_COLORS = ['#4A90E2', '#50C878', '#FFB347', '#FF6B6B', '#A463F2', 
+              '#45B7D1', '#FFA07A', '#98D8C8', '#F7DC6F', '#BB8FCE']
+
+
+def bar_color_for_count(count, max_val):
+    """Цвет столбца в зависимости от количества (4 уровня)"""
+    if count == 0:
+        return '#e9ecef'  # Серый для нуля
+    
+    ratio = count / max_val
+    
+    # 4 уровня синего (как в календаре)
+    if ratio <= 0.25:
+        return '#c6dbef'  # Светло-голубой
+    elif ratio <= 0.5:
+        return '#6baed6'  # Голубой
+    elif ratio <= 0.75:
+        return '#3182bd'  # Синий
+    else:
+        return '#08519c'  # Темно-синий
+
+
+def plot_message(axes, text, font_family, fontsize=12):
+    """Сообщение вместо графика (загрузка, нет данных)"""
+    axes.axis('off')
+    axes.text(0.5, 0.5, text, 
+              ha='center', va='center', fontsize=fontsize, color='#666',
+              fontfamily=font_family,
+              transform=axes.transAxes)
+
+
+def plot_bar_axes(axes, days, font_family):
+    """Оси, подписи и пустые столбцы графика по дням недели; вернуть (столбцы, подписи значений)"""
+    bars = list(axes.bar(days, [0] * len(days), color='#e9ecef', alpha=0.9, edgecolor='#2c3e50', linewidth=1.5))
+    labels = [
+        axes.text(bar.get_x() + bar.get_width()/2., 0, '',
+                  ha='center', va='bottom',
+                  fontsize=11, weight='bold',
+                  fontfamily=font_family,
+                  color='#2c3e50')
+        for bar in bars
+    ]
+    
+    axes.set_xlabel('День недели', fontsize=11, fontfamily=font_family, color='#2c3e50')
+    axes.set_ylabel('Количество задач', fontsize=11, fontfamily=font_family, color='#2c3e50')
+    axes.set_title('Задачи по дням недели', 
+                   fontsize=12, weight='bold', pad=15, color='#2c3e50',
+                   fontfamily=font_family)
+    
+    # Настройка осей
+    axes.spines['top'].set_visible(False)
+    axes.spines['right'].set_visible(False)
+    axes.spines['left'].set_color('#dee2e6')
+    axes.spines['bottom'].set_color('#dee2e6')
+    
+    # Скрываем метки на оси Y
+    axes.tick_params(left=False, labelleft=False, colors='#495057', labelsize=10)
+    return bars, labels
+
+
+def set_bar_values(axes, bars, labels, counts):
+    """Высоты, цвета и подписи столбцов"""
+    # Определяем максимум для градиента
+    max_count = max(counts) if max(counts) > 0 else 1
+    
+    for bar, label, count in zip(bars, labels, counts):
+        bar.set_height(count)
+        bar.set_facecolor(bar_color_for_count(count, max_count))
+        # Значение над столбцом
+        label.set_y(count)
+        label.set_text(f'{int(count)}')
+        label.set_visible(count > 0)
+    
+    # Установка минимума для лучшего отображения
+    axes.set_ylim(0, max(max(counts) * 1.2, 1))
+
+
+def plot_pie(axes, labels, sizes, font_family):
+    """Круговая диаграмма по разделам; вернуть (секторы, подписи, проценты)"""
+    wedges, texts, autotexts = axes.pie(
+        sizes, 
+        labels=labels, 
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=PIE_COLORS[:len(sizes)],
+        textprops={'fontsize': 9, 'weight': 'bold', 'family': font_family}
+    )
+    
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontsize(8)
+        autotext.set_fontfamily(font_family)
+    
+    axes.axis('off')
+    
+    axes.set_title('Выполненные задачи', 
+                   fontsize=12, weight='bold', pad=15, color='#2c3e50',
+                   fontfamily=font_family)
+    return list(wedges), list(texts), list(autotexts)
+
+
+class MplCanvas(QtWidgets.QWidget):
+    def __init__(self, parent=None, width=8, height=6, dpi=100, font_family=DEFAULT_FONT_FAMILY):
+        # matplotlib импортируется только при создании первого холста этого бэкенда
+        FigureCanvas, Figure = import_matplotlib(font_family)
         
-        return all_items
-    def create_task(self, content, project_id=None, due_date=None, section_id=None):
-        """Создать новую задачу"""
-        task_data = {
-            "content": content
-        }
+        super().__init__()
+        self.font_family = font_family
+        
+        fig = Figure(figsize=(width, height), dpi=dpi, 
+                     facecolor='none', constrained_layout=True)
+        self.figure = fig
+        self.axes = fig.add_subplot(111)
+        self.axes.set_facecolor('none')
+        self.canvas = FigureCanvas(fig)
+        
+        self.canvas.setStyleSheet("background-color: transparent;")
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.canvas)
+        
+        self.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Expanding,
+            QtWidgets.QSizePolicy.Policy.Expanding
+        )
+        
+        self.setMinimumSize(400, 400)
+        self.layout_fixed = False
+        
+        # Построенный график обновляется на месте; полная перестройка - только при смене категорий
+        self.chart_key = None  # ('bar',) или ('pie', названия разделов)
+        self.bars = []
+        self.bar_labels = []
+        self.wedges = []
+        self.pie_texts = []
+        self.pie_autotexts = []
+        self.animated_artists = []  # Меняющиеся художники, рисуются поверх сохраненного фона
+        self.blit_target = None  # Оси или фигура: область, которая перерисовывается
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        
+        self.show_loading_state()
+    
+    def reset_chart(self):
+        """Забыть построенный график перед полной перерисовкой осей"""
+        self.axes.clear()
+        self.axes.set_facecolor('none')
+        self.chart_key = None
+        self.bars, self.bar_labels = [], []
+        self.wedges, self.pie_texts, self.pie_autotexts = [], [], []
+        self.animated_artists = []
+        self.background = None
+    
+    def on_draw(self, event):
+        """После полной отрисовки запомнить фон без меняющихся художников и дорисовать их"""
+        if not self.animated_artists:
+            return
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for artist in self.animated_artists:
+            self.figure.draw_artist(artist)
+    
+    def redraw_animated(self):
+        """Перерисовать только меняющихся художников поверх фона (blitting)"""
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        for artist in self.animated_artists:
+            self.figure.draw_artist(artist)
+        self.canvas.blit(self.blit_target.bbox)
+    
+    def show_loading_state(self):
+        """Показать состояние загрузки вместо пустых осей"""
+        self.reset_chart()
+        plot_message(self.axes, '⏳ Загрузка...', self.font_family, fontsize=14)
+        self.canvas.draw_idle()
+    
+    def create_bar_chart(self, weekday_data):
+        """weekday_data: словарь {день_недели: количество}"""
+        if not weekday_data:
+            self.reset_chart()
+            plot_message(self.axes, 'Нет данных за эту неделю', self.font_family)
+            self.canvas.draw_idle()
+            return
+        
+        days = WEEKDAY_NAMES
+        counts = [weekday_data.get(day, 0) for day in days]
         
-        if project_id:
-            task_data["project_id"] = project_id
+        if self.chart_key != ('bar',):
+            self.build_bar_chart(days)
         
-        if due_date:
-            task_data["due_string"] = due_date
+        set_bar_values(self.axes, self.bars, self.bar_labels, counts)
+        self.redraw_animated()
+    
+    def build_bar_chart(self, days):
+        """Построить оси, подписи и пустые столбцы; дальше меняются только высоты и цвета"""
+        self.reset_chart()
+        self.bars, self.bar_labels = plot_bar_axes(self.axes, days, self.font_family)
+        
+        self.animated_artists = self.bars + self.bar_labels
+        for artist in self.animated_artists:
+            artist.set_animated(True)
+        # Подписи оси Y скрыты - при смене масштаба меняется только содержимое осей
+        self.blit_target = self.axes
+        self.chart_key = ('bar',)
+        self.canvas.draw_idle()
+
+    def create_pie_chart(self, section_data):
+        """section_data: словарь {название_раздела: количество_задач}"""
+        if not section_data:
+            self.reset_chart()
+            plot_message(self.axes, 'Нет задач', self.font_family)
+            self.canvas.draw_idle()
+            return
+        
+        labels = list(section_data.keys())
+        sizes = list(section_data.values())
         
-        if section_id:
-            task_data["section_id"] = section_id
+        if self.chart_key != ('pie', tuple(labels)):
+            self.build_pie_chart(labels, sizes)
+            return
         
-        try:
-            response = requests.post(
-                f"{self.base_url}/tasks",
-                headers=self.headers,
-                json=task_data,
-                timeout=30
-            )
+        # Те же разделы - пересчитываем только углы секторов и подписи (как в Axes.pie)
+        total = float(sum(sizes))
+        theta1 = 90.0
+        for wedge, text, autotext, size in zip(self.wedges, self.pie_texts, self.pie_autotexts, sizes):
+            fraction = size / total
+            theta2 = theta1 + 360.0 * fraction
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
             
-            if response.status_code == 200:
-                print(f"✅ Задача создана: {content}")
-                return response.json()
-            else:
-                print(f"❌ Ошибка создания задачи: {response.status_code}, {response.text}")
-                return None
-        except Exception as e:
-            print(f"❌ Ошибка при создании задачи: {e}")
-            return None
+            thetam = math.radians((theta1 + theta2) / 2.0)
+            x, y = math.cos(thetam), math.sin(thetam)
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text('%1.1f%%' % (100 * fraction))
+            theta1 = theta2
+        
+        self.redraw_animated()
+    
+    def build_pie_chart(self, labels, sizes):
+        """Построить круговую диаграмму заново (изменился набор разделов)"""
+        self.reset_chart()
+        self.wedges, self.pie_texts, self.pie_autotexts = plot_pie(self.axes, labels, sizes, self.font_family)
+        
+        self.animated_artists = self.wedges + self.pie_texts + self.pie_autotexts
+        for artist in self.animated_artists:
+            artist.set_animated(True)
+        # Подписи разделов выходят за оси - перерисовывается вся фигура
+        self.blit_target = self.figure
+        self.chart_key = ('pie', tuple(labels))
+        
+        # Убираем фиксацию layout для правильного масштабирования
+        self.canvas.draw_idle()
 
 
-class MplCanvas(FigureCanvas):
-    def __init__(self, parent=None, width=8, height=6, dpi=100, font_family=DEFAULT_FONT_FAMILY):
+class NativeChartWidget(QtWidgets.QWidget):
+    """Основа графиков на QPainter: без matplotlib и растеризации Agg"""
+    TITLE_PAD = 15  # Отступ заголовка от области графика, как pad в matplotlib
+    
+    def __init__(self, parent=None, font_family=DEFAULT_FONT_FAMILY):
+        super().__init__(parent)
         self.font_family = font_family
-        
-        fig = Figure(figsize=(width, height), dpi=dpi, 
-                     facecolor='none', constrained_layout=True)
-        self.axes = fig.add_subplot(111)
-        self.axes.set_facecolor('none')
-        super().__init__(fig)
-        
-        self.setStyleSheet("background-color: transparent;")
+        self.title_font = QtGui.QFont(font_family, 12, QtGui.QFont.Weight.Bold)
+        self.message = None
+        self.message_size = 12
         
         self.setSizePolicy(
             QtWidgets.QSizePolicy.Policy.Expanding,
@@ -303,147 +2145,555 @@ class MplCanvas(FigureCanvas):
         )
         
         self.setMinimumSize(400, 400)
-        self.layout_fixed = False
         self.show_loading_state()
     
     def show_loading_state(self):
-        """Показать состояние загрузки вместо пустых осей"""
-        self.axes.clear()
-        self.axes.set_facecolor('none')
-        self.axes.axis('off')
-        self.axes.text(0.5, 0.5, '⏳ Загрузка...', 
-                      ha='center', va='center', 
-                      fontsize=14, color='#666',
-                      fontfamily=self.font_family,
-                      transform=self.axes.transAxes)
-        self.draw_idle()
+        """Показать состояние загрузки вместо пустого графика"""
+        self.show_message('⏳ Загрузка...', 14)
+    
+    def show_message(self, text, size=12):
+        self.message = text
+        self.message_size = size
+        self.update()
+    
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.TextAntialiasing)
+        
+        if self.message:
+            painter.setFont(QtGui.QFont(self.font_family, self.message_size))
+            painter.setPen(QtGui.QColor('#666666'))
+            painter.drawText(self.rect(), QtCore.Qt.AlignmentFlag.AlignCenter, self.message)
+        else:
+            self.paint_chart(painter, QtCore.QRectF(self.rect()).adjusted(8, 8, -8, -8))
+        
+        painter.end()
+    
+    def draw_title(self, painter, rect, text):
+        """Нарисовать заголовок и вернуть область под ним"""
+        painter.setFont(self.title_font)
+        painter.setPen(QtGui.QColor('#2c3e50'))
+        height = QtGui.QFontMetricsF(self.title_font).height()
+        painter.drawText(
+            QtCore.QRectF(rect.left(), rect.top(), rect.width(), height),
+            QtCore.Qt.AlignmentFlag.AlignCenter, text
+        )
+        return rect.adjusted(0, height + self.TITLE_PAD, 0, 0)
+    
+    def paint_chart(self, painter, rect):
+        """Нарисовать график в области rect - переопределяется в наследниках; основа ничего не рисует"""
+        pass
+
+
+class BarChartWidget(NativeChartWidget):
+    """Столбчатый график по дням недели на QPainter (вид как у MplCanvas.create_bar_chart)"""
+    BAR_WIDTH = 0.8
+    X_MARGIN = 0.05  # Поля по оси X, как автомасштаб matplotlib
+    
+    def __init__(self, parent=None, font_family=DEFAULT_FONT_FAMILY):
+        self.days = []
+        self.counts = []
+        self.colors = []
+        super().__init__(parent, font_family)
+        self.label_font = QtGui.QFont(font_family, 11)
+        self.value_font = QtGui.QFont(font_family, 11, QtGui.QFont.Weight.Bold)
+        self.tick_font = QtGui.QFont(font_family, 10)
     
     def create_bar_chart(self, weekday_data):
         """weekday_data: словарь {день_недели: количество}"""
-        self.axes.clear()
-        self.axes.set_facecolor('none')
-        
         if not weekday_data:
-            self.axes.axis('off')
-            self.axes.text(0.5, 0.5, 'Нет данных за эту неделю', 
-                        ha='center', va='center', fontsize=12, color='#666',
-                        fontfamily=self.font_family,
-                        transform=self.axes.transAxes)
-            self.draw_idle()
+            self.show_message('Нет данных за эту неделю')
             return
         
-        days_order = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
-        days = []
-        counts = []
-        
-        for day in days_order:
-            days.append(day)
-            counts.append(weekday_data.get(day, 0))
+        self.days = WEEKDAY_NAMES
+        self.counts = [weekday_data.get(day, 0) for day in self.days]
         
         # Определяем максимум для градиента
-        max_count = max(counts) if counts and max(counts) > 0 else 1
-        
-        # Функция для получения цвета в зависимости от количества (4 уровня)
-        def get_bar_color(count, max_val):
-            if count == 0:
-                return '#e9ecef'  # Серый для нуля
-            
-            ratio = count / max_val
-            
-            # 4 уровня синего (как в календаре)
-            if ratio <= 0.25:
-                return '#c6dbef'  # Светло-голубой
-            elif ratio <= 0.5:
-                return '#6baed6'  # Голубой
-            elif ratio <= 0.75:
-                return '#3182bd'  # Синий
-            else:
-                return '#08519c'  # Темно-синий
-        
-        # Создаем цвета для каждого столбца
-        colors = [get_bar_color(count, max_count) for count in counts]
+        max_count = max(self.counts) if max(self.counts) > 0 else 1
+        self.colors = [bar_color_for_count(count, max_count) for count in self.counts]
         
-        bars = self.axes.bar(days, counts, color=colors, alpha=0.9, edgecolor='#2c3e50', linewidth=1.5)
-        
-        # Добавляем значения над столбцами
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            if height > 0:
-                self.axes.text(bar.get_x() + bar.get_width()/2., height,
-                            f'{int(height)}',
-                            ha='center', va='bottom',
-                            fontsize=11, weight='bold',
-                            fontfamily=self.font_family,
-                            color='#2c3e50')
-        
-        self.axes.set_xlabel('День недели', fontsize=11, fontfamily=self.font_family, color='#2c3e50')
-        self.axes.set_ylabel('Количество задач', fontsize=11, fontfamily=self.font_family, color='#2c3e50')
-        self.axes.set_title('Задачи по дням недели', 
-                        fontsize=12, weight='bold', pad=15, color='#2c3e50',
-                        fontfamily=self.font_family)
-        
-        # Настройка осей
-        self.axes.spines['top'].set_visible(False)
-        self.axes.spines['right'].set_visible(False)
-        self.axes.spines['left'].set_color('#dee2e6')
-        self.axes.spines['bottom'].set_color('#dee2e6')
-        
-        # Скрываем метки на оси Y
-        self.axes.tick_params(left=False, labelleft=False, colors='#495057', labelsize=10)
-        
-        # Установка минимума для лучшего отображения
-        max_count_display = max(counts) if counts else 0
-        self.axes.set_ylim(0, max(max_count_display * 1.2, 1))
-        
-        # Убрана строка с grid - теперь нет горизонтальных линий
-        
-        self.draw_idle()
-
+        self.message = None
+        self.update()
+    
+    def paint_chart(self, painter, rect):
+        rect = self.draw_title(painter, rect, 'Задачи по дням недели')
+        
+        label_height = QtGui.QFontMetricsF(self.label_font).height()
+        tick_height = QtGui.QFontMetricsF(self.tick_font).height()
+        
+        # Подписи осей
+        painter.setFont(self.label_font)
+        painter.setPen(QtGui.QColor('#2c3e50'))
+        painter.drawText(
+            QtCore.QRectF(rect.left(), rect.bottom() - label_height, rect.width(), label_height),
+            QtCore.Qt.AlignmentFlag.AlignCenter, 'День недели'
+        )
+        painter.save()
+        painter.translate(rect.left(), rect.center().y())
+        painter.rotate(-90)
+        painter.drawText(
+            QtCore.QRectF(-rect.height() / 2, 0, rect.height(), label_height),
+            QtCore.Qt.AlignmentFlag.AlignCenter, 'Количество задач'
+        )
+        painter.restore()
+        
+        plot = rect.adjusted(label_height + 6, 0, 0, -(label_height + tick_height + 8))
+        
+        # Оси: только левая и нижняя линии
+        painter.setPen(QtGui.QPen(QtGui.QColor('#dee2e6'), 1))
+        painter.drawLine(plot.bottomLeft(), plot.topLeft())
+        painter.drawLine(plot.bottomLeft(), plot.bottomRight())
+        
+        # Масштаб: X - как автомасштаб matplotlib, Y - до 1.2 максимума
+        slots = len(self.days)
+        x_min = -self.BAR_WIDTH / 2 - self.X_MARGIN * (slots - 1 + self.BAR_WIDTH)
+        x_max = slots - 1 + self.BAR_WIDTH / 2 + self.X_MARGIN * (slots - 1 + self.BAR_WIDTH)
+        x_scale = plot.width() / (x_max - x_min)
+        y_max = max(max(self.counts) * 1.2, 1)
+        y_scale = plot.height() / y_max
+        
+        edge_pen = QtGui.QPen(QtGui.QColor('#2c3e50'), 1.5)
+        value_height = QtGui.QFontMetricsF(self.value_font).height()
+        for i, (day, count, color) in enumerate(zip(self.days, self.counts, self.colors)):
+            left = plot.left() + (i - self.BAR_WIDTH / 2 - x_min) * x_scale
+            width = self.BAR_WIDTH * x_scale
+            top = plot.bottom() - count * y_scale
+            
+            # Столбец рисуется и при нуле - как в matplotlib, остается линия контура
+            fill = QtGui.QColor(color)
+            fill.setAlphaF(0.9)
+            painter.setPen(edge_pen)
+            painter.setBrush(fill)
+            painter.drawRect(QtCore.QRectF(left, top, width, count * y_scale))
+            
+            if count > 0:
+                # Значение над столбцом
+                painter.setFont(self.value_font)
+                painter.setPen(QtGui.QColor('#2c3e50'))
+                painter.drawText(
+                    QtCore.QRectF(left - width, top - value_height, width * 3, value_height),
+                    QtCore.Qt.AlignmentFlag.AlignHCenter | QtCore.Qt.AlignmentFlag.AlignBottom, f'{int(count)}'
+                )
+            
+            painter.setFont(self.tick_font)
+            painter.setPen(QtGui.QColor('#495057'))
+            painter.drawText(
+                QtCore.QRectF(left - width, plot.bottom() + 4, width * 3, tick_height),
+                QtCore.Qt.AlignmentFlag.AlignCenter, day
+            )
 
 
+class PieChartWidget(NativeChartWidget):
+    """Круговая диаграмма по разделам на QPainter (вид как у MplCanvas.create_pie_chart)"""
+    PIE_LIMIT = 1.25  # Оси круговой диаграммы matplotlib: от -1.25 до 1.25 радиуса
+    
+    def __init__(self, parent=None, font_family=DEFAULT_FONT_FAMILY):
+        self.labels = []
+        self.sizes = []
+        super().__init__(parent, font_family)
+        self.label_font = QtGui.QFont(font_family, 9, QtGui.QFont.Weight.Bold)
+        self.percent_font = QtGui.QFont(font_family, 8, QtGui.QFont.Weight.Bold)
+    
     def create_pie_chart(self, section_data):
         """section_data: словарь {название_раздела: количество_задач}"""
-        self.axes.clear()
-        self.axes.set_facecolor('none')
-        
         if not section_data:
-            self.axes.axis('off')
-            self.axes.text(0.5, 0.5, 'Нет задач', 
-                        ha='center', va='center', fontsize=12, color='#666',
-                        fontfamily=self.font_family,
-                        transform=self.axes.transAxes)
-            self.draw_idle()
+            self.show_message('Нет задач')
             return
         
-        labels = list(section_data.keys())
-        sizes = list(section_data.values())
-        
-        colors = ['#4A90E2', '#50C878', '#FFB347', '#FF6B6B', '#A463F2', 
-                '#45B7D1', '#FFA07A', '#98D8C8', '#F7DC6F', '#BB8FCE']
+        self.labels = list(section_data.keys())
+        self.sizes = list(section_data.values())
+        self.message = None
+        self.update()
+    
+    def paint_chart(self, painter, rect):
+        rect = self.draw_title(painter, rect, 'Выполненные задачи')
+        
+        radius = min(rect.width(), rect.height()) / (2 * self.PIE_LIMIT)
+        center = rect.center()
+        pie_rect = QtCore.QRectF(center.x() - radius, center.y() - radius, 2 * radius, 2 * radius)
+        
+        total = float(sum(self.sizes))
+        theta1 = 90.0
+        painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        for i, size in enumerate(self.sizes):
+            fraction = size / total
+            span = 360.0 * fraction
+            
+            # Углы QPainter - в 1/16 градуса, против часовой стрелки от оси X, как в matplotlib
+            painter.setBrush(QtGui.QColor(PIE_COLORS[i % len(PIE_COLORS)]))
+            painter.drawPie(pie_rect, int(round(theta1 * 16)), int(round(span * 16)))
+            
+            thetam = math.radians(theta1 + span / 2)
+            x, y = math.cos(thetam), -math.sin(thetam)
+            
+            painter.setFont(self.label_font)
+            painter.setPen(QtGui.QColor('#000000'))
+            label_point = QtCore.QPointF(center.x() + 1.1 * radius * x, center.y() + 1.1 * radius * y)
+            label_width = QtGui.QFontMetricsF(self.label_font).horizontalAdvance(self.labels[i]) + 2
+            label_rect = QtCore.QRectF(
+                label_point.x() if x > 0 else label_point.x() - label_width,
+                label_point.y() - radius, label_width, 2 * radius
+            )
+            painter.drawText(label_rect, QtCore.Qt.AlignmentFlag.AlignVCenter | (
+                QtCore.Qt.AlignmentFlag.AlignLeft if x > 0 else QtCore.Qt.AlignmentFlag.AlignRight
+            ), self.labels[i])
+            
+            painter.setFont(self.percent_font)
+            painter.setPen(QtGui.QColor('#ffffff'))
+            percent_point = QtCore.QPointF(center.x() + 0.6 * radius * x, center.y() + 0.6 * radius * y)
+            painter.drawText(
+                QtCore.QRectF(percent_point.x() - radius, percent_point.y() - radius, 2 * radius, 2 * radius),
+                QtCore.Qt.AlignmentFlag.AlignCenter, '%1.1f%%' % (100 * fraction)
+            )
+            painter.setPen(QtCore.Qt.PenStyle.NoPen)
+            theta1 += span
+
+
+def render_chart_image(kind, data, width, height, pixel_ratio, font_family):
+    """Отрисовать график matplotlib в QImage размером width x height (логических пикселей).
+    
+    Вызывается из ChartRenderThread: используется только холст Agg, без виджетов Qt.
+    """
+    FigureCanvasAgg, Figure = import_matplotlib_agg(font_family)
+    
+    fig = Figure(figsize=(width / CHART_IMAGE_DPI, height / CHART_IMAGE_DPI),
+                 dpi=CHART_IMAGE_DPI * pixel_ratio,
+                 facecolor='none', constrained_layout=True)
+    axes = fig.add_subplot(111)
+    axes.set_facecolor('none')
+    
+    if kind == 'bar':
+        bars, labels = plot_bar_axes(axes, WEEKDAY_NAMES, font_family)
+        set_bar_values(axes, bars, labels, [data.get(day, 0) for day in WEEKDAY_NAMES])
+    else:
+        plot_pie(axes, list(data.keys()), list(data.values()), font_family)
+    
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    pixel_width, pixel_height = canvas.get_width_height()
+    image = QtGui.QImage(
+        bytes(canvas.buffer_rgba()), pixel_width, pixel_height,
+        pixel_width * 4, QtGui.QImage.Format.Format_RGBA8888
+    ).copy()  # Своя копия пикселей: буфер bytes живет только до выхода из функции
+    image.setDevicePixelRatio(pixel_ratio)
+    return image
+
+
+class ChartRenderThread(QtCore.QThread):
+    """Поток отрисовки графиков matplotlib в QImage.
+    
+    Для каждого холста хранится только последнее задание: если данные или размер
+    успели смениться, пока поток был занят, промежуточные картинки не рисуются.
+    """
+    image_rendered = QtCore.pyqtSignal(object, object)  # (ключ картинки, QImage)
+    
+    def __init__(self):
+        super().__init__()
+        self.jobs = OrderedDict()  # {холст: (ключ, вид, данные, ширина, высота, масштаб, шрифт)}
+        self.condition = threading.Condition()
+        self.running = True
+    
+    def submit(self, owner, job):
+        with self.condition:
+            self.jobs.pop(owner, None)
+            self.jobs[owner] = job
+            self.condition.notify()
+    
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.jobs.clear()
+            self.condition.notify()
+        self.wait()
+    
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.jobs:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                _, (key, kind, data, width, height, pixel_ratio, font_family) = self.jobs.popitem(last=False)
+            
+            try:
+                image = render_chart_image(kind, data, width, height, pixel_ratio, font_family)
+                self.image_rendered.emit(key, image)
+            except Exception as e:
+                print(f"❌ Ошибка отрисовки графика: {e}")
+
+
+class ChartImageRenderer(QtCore.QObject):
+    """Фоновый рендер графиков и кэш готовых картинок.
+    
+    Ключ кэша - (вид, отпечаток данных, ширина, высота, масштаб экрана), поэтому
+    возврат к прежнему размеру окна или на уже открытую страницу не рисует заново.
+    QPixmap можно создавать только в потоке интерфейса: поток возвращает QImage,
+    а в QPixmap он переводится здесь, в обработчике сигнала.
+    """
+    image_ready = QtCore.pyqtSignal(object, object)  # (ключ картинки, QPixmap)
+    
+    def __init__(self, cache_size=CHART_IMAGE_CACHE_SIZE):
+        super().__init__()
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # {ключ: QPixmap}, от давно использованных к недавним
+        self.thread = ChartRenderThread()
+        self.thread.image_rendered.connect(self.on_image_rendered)
+        self.thread.start()
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.stop)
+    
+    def stop(self):
+        """Дождаться текущей отрисовки и остановить поток (до выхода из приложения)"""
+        if self.thread.isRunning():
+            self.thread.stop()
+    
+    def cached(self, key):
+        pixmap = self.cache.get(key)
+        if pixmap is not None:
+            self.cache.move_to_end(key)
+        return pixmap
+    
+    def request(self, owner, key, kind, data, width, height, pixel_ratio, font_family):
+        """Поставить картинку в очередь; готовая придет сигналом image_ready"""
+        self.thread.submit(owner, (key, kind, data, width, height, pixel_ratio, font_family))
+    
+    def on_image_rendered(self, key, image):
+        pixmap = QtGui.QPixmap.fromImage(image)
+        self.cache[key] = pixmap
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        self.image_ready.emit(key, pixmap)
+
+
+@lru_cache(maxsize=None)
+def get_chart_renderer():
+    """Общий для всех холстов рендер: один поток и один кэш"""
+    return ChartImageRenderer()
+
+
+class ImageChartCanvas(QtWidgets.QWidget):
+    """График matplotlib, отрисованный в фоновом потоке.
+    
+    Виджет только выводит готовую картинку, поэтому растеризация не задерживает
+    обработку ввода. Пока новая картинка рисуется, показывается прежняя
+    (при изменении размера - растянутая).
+    """
+    
+    def __init__(self, kind, parent=None, font_family=DEFAULT_FONT_FAMILY):
+        super().__init__(parent)
+        self.kind = kind  # 'bar' или 'pie'
+        self.font_family = font_family
+        self.chart_data = None
+        self.fingerprint = None
+        self.message = None
+        self.message_size = 12
+        self.pixmap = None
+        self.pixmap_key = None
+        self.pending_key = None  # Картинка, которую ждем от потока
+        
+        self.renderer = get_chart_renderer()
+        self.renderer.image_ready.connect(self.on_image_ready)
+        
+        # Во время перетаскивания края окна рисуем только после паузы
+        self.resize_timer = QtCore.QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(CHART_RESIZE_DELAY)
+        self.resize_timer.timeout.connect(self.request_image)
         
-        wedges, texts, autotexts = self.axes.pie(
-            sizes, 
-            labels=labels, 
-            autopct='%1.1f%%',
-            startangle=90,
-            colors=colors[:len(sizes)],
-            textprops={'fontsize': 9, 'weight': 'bold', 'family': self.font_family}
+        self.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Expanding,
+            QtWidgets.QSizePolicy.Policy.Expanding
         )
         
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontsize(8)
-            autotext.set_fontfamily(self.font_family)
-        
-        self.axes.axis('off')
-        
-        self.axes.set_title('Выполненные задачи', 
-                        fontsize=12, weight='bold', pad=15, color='#2c3e50',
-                        fontfamily=self.font_family)
+        self.setMinimumSize(400, 400)
+        self.show_loading_state()
+    
+    def show_loading_state(self):
+        """Показать состояние загрузки вместо пустого графика"""
+        self.show_message('⏳ Загрузка...', 14)
+    
+    def show_message(self, text, size=12):
+        self.message = text
+        self.message_size = size
+        self.chart_data = None
+        self.pending_key = None
+        self.update()
+    
+    def create_bar_chart(self, weekday_data):
+        """weekday_data: словарь {день_недели: количество}"""
+        if not weekday_data:
+            self.show_message('Нет данных за эту неделю')
+            return
+        self.set_chart_data({day: weekday_data.get(day, 0) for day in WEEKDAY_NAMES})
+    
+    def create_pie_chart(self, section_data):
+        """section_data: словарь {название_раздела: количество_задач}"""
+        if not section_data:
+            self.show_message('Нет задач')
+            return
+        self.set_chart_data(dict(section_data))
+    
+    def set_chart_data(self, data):
+        self.chart_data = data
+        self.fingerprint = content_fingerprint(self.kind, data)
+        self.message = None
+        self.request_image()
+    
+    def image_key(self):
+        return (self.kind, self.fingerprint, self.width(), self.height(), self.devicePixelRatioF())
+    
+    def use_cached_image(self):
+        """Показать картинку из кэша, если она уже нарисована для текущих данных и размера"""
+        key = self.image_key()
+        if key == self.pixmap_key:
+            self.pending_key = None
+            return True
+        pixmap = self.renderer.cached(key)
+        if pixmap is None:
+            return False
+        self.pixmap, self.pixmap_key = pixmap, key
+        self.pending_key = None
+        self.update()
+        return True
+    
+    def request_image(self):
+        """Взять картинку из кэша или заказать ее фоновому потоку"""
+        # Скрытый виджет еще не знает своего размера - рисуем при показе
+        if self.chart_data is None or not self.isVisible():
+            return
+        if self.use_cached_image():
+            return
+        key = self.image_key()
+        if key == self.pending_key:
+            return
+        self.pending_key = key
+        self.renderer.request(
+            id(self), key, self.kind, self.chart_data,
+            self.width(), self.height(), self.devicePixelRatioF(), self.font_family
+        )
+        self.update()
+    
+    def on_image_ready(self, key, pixmap):
+        if key != self.pending_key:
+            return
+        self.pixmap, self.pixmap_key = pixmap, key
+        self.pending_key = None
+        self.update()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.request_image()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.chart_data is None or not self.isVisible():
+            return
+        if self.use_cached_image():
+            self.resize_timer.stop()
+        else:
+            self.resize_timer.start()
+    
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        
+        if self.message or self.pixmap is None:
+            # Первая картинка еще рисуется - остается сообщение о загрузке
+            painter.setRenderHint(QtGui.QPainter.RenderHint.TextAntialiasing)
+            painter.setFont(QtGui.QFont(self.font_family, self.message_size))
+            painter.setPen(QtGui.QColor('#666666'))
+            painter.drawText(self.rect(), QtCore.Qt.AlignmentFlag.AlignCenter, self.message or '⏳ Загрузка...')
+        else:
+            # Картинка другого размера растягивается, пока поток рисует новую
+            painter.setRenderHint(QtGui.QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawPixmap(QtCore.QRectF(self.rect()), self.pixmap, QtCore.QRectF(self.pixmap.rect()))
         
-        # Убираем фиксацию layout для правильного масштабирования
-        self.draw_idle()
+        painter.end()
+
 
+def create_chart_canvas(kind, parent=None, width=8, height=6, dpi=100, font_family=DEFAULT_FONT_FAMILY):
+    """Холст графика выбранного бэкенда (CHART_BACKEND); kind - 'bar' или 'pie'"""
+    if CHART_BACKEND == 'native':
+        widget_class = BarChartWidget if kind == 'bar' else PieChartWidget
+        return widget_class(parent, font_family)
+    if CHART_BACKEND == 'image':
+        return ImageChartCanvas(kind, parent, font_family)
+    return MplCanvas(parent, width=width, height=height, dpi=dpi, font_family=font_family)
+
+
+class CalendarGridWidget(QtWidgets.QWidget):
+    """Сетка дней месяца 6x7, рисуется целиком в одном paintEvent"""
+    CELL_SIZE = 50
+    SPACING = 6
+    ROWS = 6
+    
+    def __init__(self, font_family=DEFAULT_FONT_FAMILY):
+        super().__init__()
+        self.cell_font = QtGui.QFont(font_family, 12, QtGui.QFont.Weight.Bold)
+        self.cells = [None] * (self.ROWS * 7)  # (день, цвет, цвет текста, подсказка) или None
+        self.rows_used = 0
+        self.set_rows(5)
+    
+    def set_rows(self, rows):
+        """Высота сетки по числу недель месяца"""
+        if rows == self.rows_used:
+            return
+        self.rows_used = rows
+        step = self.CELL_SIZE + self.SPACING
+        self.setFixedSize(7 * step - self.SPACING, rows * step - self.SPACING)
+    
+    def set_cells(self, cells, rows):
+        """Заменить состояние клеток; перерисовываются только изменившиеся"""
+        self.set_rows(rows)
+        for index, cell in enumerate(cells):
+            if cell != self.cells[index]:
+                self.cells[index] = cell
+                self.update(self.cell_rect(index))
+    
+    def cell_rect(self, index):
+        step = self.CELL_SIZE + self.SPACING
+        row, col = divmod(index, 7)
+        return QtCore.QRect(col * step, row * step, self.CELL_SIZE, self.CELL_SIZE)
+    
+    def cell_at(self, pos):
+        step = self.CELL_SIZE + self.SPACING
+        col, row = pos.x() // step, pos.y() // step
+        if 0 <= col < 7 and 0 <= row < self.rows_used and self.cell_rect(row * 7 + col).contains(pos):
+            return self.cells[row * 7 + col]
+        return None
+    
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        painter.setFont(self.cell_font)
+        painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        
+        for index, cell in enumerate(self.cells):
+            if cell is None:
+                continue
+            rect = self.cell_rect(index)
+            if not event.rect().intersects(rect):
+                continue
+            day, color, text_color, _ = cell
+            
+            painter.setBrush(QtGui.QColor(color))
+            painter.drawRoundedRect(QtCore.QRectF(rect), 8, 8)
+            painter.setPen(QtGui.QColor(text_color))
+            painter.drawText(rect, QtCore.Qt.AlignmentFlag.AlignCenter, str(day))
+            painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        
+        painter.end()
+    
+    def event(self, event):
+        if event.type() == QtCore.QEvent.Type.ToolTip:
+            cell = self.cell_at(event.pos())
+            if cell is not None:
+                QtWidgets.QToolTip.showText(event.globalPos(), cell[3], self)
+            else:
+                QtWidgets.QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
 
 
 class MonthCalendarWidget(QtWidgets.QFrame):
@@ -490,11 +2740,8 @@ class MonthCalendarWidget(QtWidgets.QFrame):
         
         self.main_layout.addWidget(days_widget)
         
-        # Календарная сетка
-        self.calendar_widget = QtWidgets.QWidget()
-        self.calendar_layout = QtWidgets.QGridLayout(self.calendar_widget)
-        self.calendar_layout.setSpacing(6)
-        self.calendar_layout.setContentsMargins(0, 0, 0, 0)
+        # Календарная сетка: создается один раз, дальше меняются только клетки
+        self.calendar_widget = CalendarGridWidget(self.font_family)
         self.main_layout.addWidget(self.calendar_widget)
         
         self.main_layout.addStretch()
@@ -519,29 +2766,13 @@ class MonthCalendarWidget(QtWidgets.QFrame):
         else:
             return '#08519c'  # Темно-синий
     
-    def update_data(self, all_completed):
-        """Обновить календарь с данными"""
-        # Очищаем старые виджеты
-        while self.calendar_layout.count():
-            child = self.calendar_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-        
+    def update_data(self, date_counts):
+        """Обновить календарь с данными (date_counts - {date: количество} за текущий месяц)"""
         # Получаем текущий месяц
         now = datetime.now()
-        self.title_label.setText(now.strftime('%B %Y'))
-        
-        # Подсчитываем задачи по дням текущего месяца
-        self.date_counts = {}
-        for task in all_completed:
-            completed_at = task.get('completed_at')
-            if completed_at:
-                task_date = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
-                if task_date.year == now.year and task_date.month == now.month:
-                    date_key = task_date.date()
-                    self.date_counts[date_key] = self.date_counts.get(date_key, 0) + 1
-        
-        max_count = max(self.date_counts.values()) if self.date_counts else 1
+        title = now.strftime('%B %Y')
+        if self.title_label.text() != title:
+            self.title_label.setText(title)
         
         # Определяем первый день месяца и количество дней
         first_day = datetime(now.year, now.month, 1)
@@ -554,123 +2785,22 @@ class MonthCalendarWidget(QtWidgets.QFrame):
             next_month = datetime(now.year, now.month + 1, 1)
         days_in_month = (next_month - first_day).days
         
-        # Создаем клетки календаря
-        row = 1
-        col = start_weekday
+        self.date_counts = date_counts
+        
+        max_count = max(self.date_counts.values()) if self.date_counts else 1
         
+        # Состояние клеток сетки; пустые клетки до и после месяца - None
+        cells = [None] * (CalendarGridWidget.ROWS * 7)
         for day in range(1, days_in_month + 1):
             date = datetime(now.year, now.month, day).date()
             count = self.date_counts.get(date, 0)
             color = self.get_color_for_count(count, max_count)
-            
-            cell = QtWidgets.QLabel(str(day))
-            cell.setFont(QtGui.QFont(self.font_family, 12, QtGui.QFont.Weight.Bold))
-            cell.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-            cell.setFixedSize(50, 50)  # Увеличено с 35x35 до 50x50
-            cell.setStyleSheet(f"""
-                background-color: {color};
-                border-radius: 8px;
-                color: {'white' if count > max_count * 0.5 else '#2c3e50'};
-            """)
-            cell.setToolTip(f"{date.strftime('%d.%m.%Y')}: {count} задач")
-            
-            self.calendar_layout.addWidget(cell, row, col)
-            
-            col += 1
-            if col > 6:
-                col = 0
-                row += 1
-
-
-class WeeklyPage(QtWidgets.QWidget):
-    """Страница с недельной статистикой и календарем месяца"""
-    def __init__(self, api, font_family):
-        super().__init__()
-        self.api = api
-        self.font_family = font_family
-        self.current_data = None
-        self.setup_ui()
-    
-    def setup_ui(self):
-        main_layout = QtWidgets.QHBoxLayout(self)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-        main_layout.setSpacing(20)
-        
-        # Левая колонка - столбчатый график
-        left_widget = QtWidgets.QWidget()
-        left_layout = QtWidgets.QVBoxLayout(left_widget)
-        left_layout.setSpacing(10)
-        
-        title_label = QtWidgets.QLabel('📅 Статистика по дням недели')
-        title_label.setFont(QtGui.QFont(self.font_family, 18, QtGui.QFont.Weight.Bold))
-        title_label.setStyleSheet("color: #2c3e50; padding: 10px;")
-        title_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-        
-        self.canvas = MplCanvas(self, width=8, height=7, dpi=100, font_family=self.font_family)
-        
-        # Время обновления
-        self.time_label = QtWidgets.QLabel('Загрузка данных...')
-        self.time_label.setFont(QtGui.QFont(self.font_family, 9))
-        self.time_label.setStyleSheet("color: #6c757d; padding: 5px;")
-        self.time_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+            text_color = 'white' if count > max_count * 0.5 else '#2c3e50'
+            tooltip = f"{date.strftime('%d.%m.%Y')}: {count} задач"
+            cells[start_weekday + day - 1] = (day, color, text_color, tooltip)
         
-        left_layout.addWidget(title_label)
-        left_layout.addWidget(self.canvas, stretch=1)
-        left_layout.addWidget(self.time_label)
-        
-        # Правая колонка - календарь месяца
-        self.month_calendar = MonthCalendarWidget(self.font_family)
-        
-        main_layout.addWidget(left_widget, stretch=3)
-        main_layout.addWidget(self.month_calendar, stretch=2)
-    
-    def update_from_data(self, data):
-        """Обновить интерфейс из данных"""
-        try:
-            self.current_data = data
-            
-            all_completed = data.get('all_completed', [])
-            
-            # Обновляем столбчатый график
-            now = datetime.now(timezone.utc)
-            start_of_week = now - timedelta(days=now.weekday())
-            start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            weekday_counts = {
-                'Пн': 0, 'Вт': 0, 'Ср': 0, 'Чт': 0, 'Пт': 0, 'Сб': 0, 'Вс': 0
-            }
-            weekday_map = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
-            
-            for task in all_completed:
-                completed_at = task.get('completed_at')
-                if completed_at:
-                    task_date = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
-                    if task_date >= start_of_week:
-                        weekday = weekday_map[task_date.weekday()]
-                        weekday_counts[weekday] += 1
-            
-            self.canvas.create_bar_chart(weekday_counts)
-            
-            # Обновляем календарь месяца
-            self.month_calendar.update_data(all_completed)
-            
-            timestamp = data.get('timestamp', '')
-            if timestamp:
-                dt = datetime.fromisoformat(timestamp)
-                self.time_label.setText(f'Обновлено: {dt.strftime("%H:%M:%S")}')
-            else:
-                current_time = QtCore.QDateTime.currentDateTime().toString('hh:mm:ss')
-                self.time_label.setText(f'Обновлено: {current_time}')
-            
-            total = sum(weekday_counts.values())
-            print(f"✅ Недельная статистика: {total} задач")
-            
-        except Exception as e:
-            print(f"❌ Ошибка: {e}")
-            import traceback
-            print(traceback.format_exc())
-
-
+        rows = (start_weekday + days_in_month + 6) // 7
+        self.calendar_widget.set_cells(cells, rows)
 
 
 class ProgressWidget(QtWidgets.QFrame):
@@ -860,8 +2990,148 @@ class StatsWidget(QtWidgets.QFrame):
             """)
 
 
+class CardListModel(QtCore.QAbstractListModel):
+    """Модель списка карточек: строки для отображения готовятся один раз при обновлении"""
+    SubtitleRole = QtCore.Qt.ItemDataRole.UserRole.value + 1
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []  # [(текст, подпись или None)]
+        self.limit = None  # Сколько строк показывать в свернутом виде (None - все)
+    
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+    
+    def set_limit(self, limit):
+        if limit == self.limit:
+            return
+        self.beginResetModel()
+        self.limit = limit
+        self.endResetModel()
+    
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows) if self.limit is None else min(self.limit, len(self.rows))
+    
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        text, subtitle = self.rows[index.row()]
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return text
+        if role == self.SubtitleRole:
+            return subtitle
+        return None
+
+
+class CardItemDelegate(QtWidgets.QStyledItemDelegate):
+    """Рисует строку списка белой карточкой с переносом текста и серой подписью под ней"""
+    PADDING = 8
+    GAP = 5  # Отступ между карточками
+    SUBTITLE_GAP = 3
+    SUBTITLE_INDENT = 20
+    
+    def __init__(self, font_family, text_color, view):
+        super().__init__(view)
+        self.view = view
+        self.text_font = QtGui.QFont(font_family, 10)
+        self.subtitle_font = QtGui.QFont(font_family, 8)
+        self.text_color = QtGui.QColor(text_color)
+        self.subtitle_color = QtGui.QColor('#6c757d')
+        self.card_color = QtGui.QColor('#ffffff')
+    
+    def text_height(self, text, width):
+        metrics = QtGui.QFontMetrics(self.text_font)
+        rect = metrics.boundingRect(
+            QtCore.QRect(0, 0, max(width - 2 * self.PADDING, 1), 100000),
+            QtCore.Qt.TextFlag.TextWordWrap, text
+        )
+        return rect.height() + 2 * self.PADDING
+    
+    def subtitle_height(self):
+        return QtGui.QFontMetrics(self.subtitle_font).height() + self.SUBTITLE_GAP
+    
+    def sizeHint(self, option, index):
+        width = self.view.viewport().width()
+        height = self.text_height(index.data(), width) + self.GAP
+        if index.data(CardListModel.SubtitleRole):
+            height += self.subtitle_height()
+        return QtCore.QSize(width, height)
+    
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        
+        rect = option.rect
+        text = index.data()
+        card_rect = QtCore.QRect(rect.left(), rect.top(), rect.width(), self.text_height(text, rect.width()))
+        painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        painter.setBrush(self.card_color)
+        painter.drawRoundedRect(QtCore.QRectF(card_rect), 5, 5)
+        
+        painter.setFont(self.text_font)
+        painter.setPen(self.text_color)
+        painter.drawText(
+            card_rect.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING),
+            QtCore.Qt.TextFlag.TextWordWrap | QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter,
+            text
+        )
+        
+        subtitle = index.data(CardListModel.SubtitleRole)
+        if subtitle:
+            subtitle_rect = QtCore.QRect(
+                rect.left() + self.SUBTITLE_INDENT, card_rect.bottom() + 1 + self.SUBTITLE_GAP,
+                rect.width() - self.SUBTITLE_INDENT, QtGui.QFontMetrics(self.subtitle_font).height()
+            )
+            painter.setFont(self.subtitle_font)
+            painter.setPen(self.subtitle_color)
+            painter.drawText(subtitle_rect, QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter, subtitle)
+        
+        painter.restore()
+
+
+def create_card_list_view(font_family, text_color):
+    """Список карточек: рисуются только видимые строки, раскладка считается порциями"""
+    view = QtWidgets.QListView()
+    view.setModel(CardListModel(view))
+    view.setItemDelegate(CardItemDelegate(font_family, text_color, view))
+    view.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
+    view.setFocusPolicy(QtCore.Qt.FocusPolicy.NoFocus)
+    view.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel)
+    view.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setResizeMode(QtWidgets.QListView.ResizeMode.Adjust)
+    view.setLayoutMode(QtWidgets.QListView.LayoutMode.Batched)
+    view.setBatchSize(100)
+    view.setStyleSheet("""
+        QListView {
+            border: none;
+            padding: 0px;
+            background-color: #f8f9fa;
+        }
+        QScrollBar:vertical {
+            border: none;
+            background: #e9ecef;
+            width: 8px;
+            border-radius: 4px;
+        }
+        QScrollBar::handle:vertical {
+            background: #6c757d;
+            border-radius: 4px;
+        }
+        QScrollBar::handle:vertical:hover {
+            background: #495057;
+        }
+    """)
+    return view
+
+
 class SectionListWidget(QtWidgets.QFrame):
     """Виджет со списком разделов (раскрывающийся)"""
+    MAX_VISIBLE_ROWS = 15
+    
     def __init__(self, title, font_family=DEFAULT_FONT_FAMILY):
         super().__init__()
         self.font_family = font_family
@@ -886,12 +3156,14 @@ class SectionListWidget(QtWidgets.QFrame):
         title.setStyleSheet("color: #2c3e50; padding: 5px;")
         self.main_layout.addWidget(title)
         
-        self.items_container = QtWidgets.QWidget()
-        self.items_layout = QtWidgets.QVBoxLayout(self.items_container)
-        self.items_layout.setContentsMargins(0, 0, 0, 0)
-        self.items_layout.setSpacing(5)
+        self.empty_label = QtWidgets.QLabel("✅ Все разделы активны")
+        self.empty_label.setFont(QtGui.QFont(self.font_family, 10))
+        self.empty_label.setStyleSheet("color: #6c757d; padding: 10px;")
+        self.empty_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.main_layout.addWidget(self.empty_label)
         
-        self.main_layout.addWidget(self.items_container)
+        self.list_view = create_card_list_view(self.font_family, '#495057')
+        self.main_layout.addWidget(self.list_view)
         
         self.expand_btn = QtWidgets.QPushButton('▼ Показать все')
         self.expand_btn.setFont(QtGui.QFont(self.font_family, 9))
@@ -938,39 +3210,30 @@ class SectionListWidget(QtWidgets.QFrame):
     
     def update_data(self, sections):
         self.all_sections = sections
+        self.list_view.model().set_rows([(f"• {section}", None) for section in sections])
         self.is_expanded = False
         self.render_items()
         QtCore.QTimer.singleShot(10, self.apply_collapsed_size)
     
     def render_items(self):
-        while self.items_layout.count():
-            child = self.items_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        self.list_view.model().set_limit(None if self.is_expanded else 3)
         
-        if not self.all_sections:
-            empty_label = QtWidgets.QLabel("✅ Все разделы активны")
-            empty_label.setFont(QtGui.QFont(self.font_family, 10))
-            empty_label.setStyleSheet("color: #6c757d; padding: 10px;")
-            empty_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-            self.items_layout.addWidget(empty_label)
-            self.expand_btn.setVisible(False)
-        else:
-            items_to_show = self.all_sections if self.is_expanded else self.all_sections[:3]
-            
-            for section in items_to_show:
-                item = QtWidgets.QLabel(f"• {section}")
-                item.setFont(QtGui.QFont(self.font_family, 10))
-                item.setStyleSheet("""
-                    color: #495057;
-                    padding: 8px;
-                    background-color: #ffffff;
-                    border-radius: 5px;
-                """)
-                item.setWordWrap(True)
-                self.items_layout.addWidget(item)
-            
-            self.expand_btn.setVisible(len(self.all_sections) > 3)
+        self.empty_label.setVisible(not self.all_sections)
+        self.list_view.setVisible(bool(self.all_sections))
+        self.expand_btn.setVisible(len(self.all_sections) > 3)
+        self.fit_list_height()
+    
+    def fit_list_height(self):
+        """Высота списка по строкам; длинный раскрытый список прокручивается"""
+        rows = min(self.list_view.model().rowCount(), self.MAX_VISIBLE_ROWS)
+        height = sum(self.list_view.sizeHintForRow(row) for row in range(rows))
+        self.list_view.setFixedHeight(height)
+    
+    def resizeEvent(self, event):
+        # Переносы строк зависят от ширины
+        super().resizeEvent(event)
+        if event.size().width() != event.oldSize().width():
+            self.fit_list_height()
 
 
 class SidebarButton(QtWidgets.QPushButton):
@@ -1002,12 +3265,15 @@ class SidebarButton(QtWidgets.QPushButton):
 
 class ProjectPage(QtWidgets.QWidget):
     """Страница с аналитикой проекта"""
+    RESOURCES = ('items', 'sections', 'completed')  # Что запрашивать, пока страница на экране (FetchPlanner)
+    
     def __init__(self, api, project_id, font_family):
         super().__init__()
         self.api = api
         self.project_id = project_id
         self.font_family = font_family
         self.current_data = None
+        self.render_key = None  # Отпечаток данных, из которых нарисована страница
         self.setup_ui()
     
     def setup_ui(self):
@@ -1023,7 +3289,7 @@ class ProjectPage(QtWidgets.QWidget):
         title_label.setStyleSheet("color: #2c3e50; padding: 10px;")
         title_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         
-        self.canvas = MplCanvas(self, width=6, height=6, dpi=100, font_family=self.font_family)
+        self.canvas = create_chart_canvas('pie', self, width=6, height=6, dpi=100, font_family=self.font_family)
         
         self.time_label = QtWidgets.QLabel('Загрузка данных...')
         self.time_label.setFont(QtGui.QFont(self.font_family, 9))
@@ -1050,57 +3316,50 @@ class ProjectPage(QtWidgets.QWidget):
         main_layout.addLayout(left_column, stretch=3)
         main_layout.addLayout(right_column, stretch=2)
     
+    @staticmethod
+    def build_view(data):
+        """Модель страницы: все, что она показывает (считается в потоке загрузчика)"""
+        sections_dict = data.get('sections', {})
+        active_tasks = data.get('active_tasks', [])
+        metrics = data_metrics(data)
+        
+        section_completed_counts = metrics.section_counts
+        
+        sections_with_active = set()
+        for task in active_tasks:
+            section_id = task.get('section_id')
+            if section_id in sections_dict:
+                sections_with_active.add(sections_dict[section_id])
+        
+        sections_without_active = [name for name in sections_dict.values() if name not in sections_with_active]
+        sections_with_completed = set(section_completed_counts.keys())
+        sections_without_completed = [name for name in sections_dict.values() if name not in sections_with_completed]
+        
+        return {
+            'section_counts': section_completed_counts,
+            'top_sections': metrics.top_sections,
+            'without_active': sections_without_active,
+            'without_completed': sections_without_completed
+        }
+    
     def update_from_data(self, data):
-        """Обновить интерфейс из данных"""
+        """Обновить интерфейс из данных (полного набора или сохраненного снимка)"""
         try:
             self.current_data = data
+            view = data_views(data)['project']
             
-            sections_dict = data.get('sections', {})
-            active_tasks = data.get('active_tasks', [])
-            completed_tasks = data.get('completed_tasks', [])
-            
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            
-            monthly_completed = []
-            for task in completed_tasks:
-                completed_at = task.get('completed_at')
-                if completed_at:
-                    task_date = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
-                    if task_date.month == current_month and task_date.year == current_year:
-                        monthly_completed.append(task)
-            
-            section_completed_counts = {}
-            for task in monthly_completed:
-                section_id = task.get('section_id')
-                section_name = sections_dict.get(section_id, 'Без раздела')
-                section_completed_counts[section_name] = section_completed_counts.get(section_name, 0) + 1
-            
-            self.canvas.create_pie_chart(section_completed_counts)
+            set_update_time(self.time_label, data)
             
-            top_sections = sorted(section_completed_counts.items(), key=lambda x: x[1], reverse=True)[:3]
-            self.progress_widget.update_data(top_sections)
+            # Перерисовываем, только если изменилось то, что показывает страница
+            render_key = content_fingerprint(view)
+            if render_key == self.render_key:
+                return
+            self.render_key = render_key
             
-            sections_with_active = set()
-            for task in active_tasks:
-                section_id = task.get('section_id')
-                if section_id in sections_dict:
-                    sections_with_active.add(sections_dict[section_id])
-            
-            sections_without_active = [name for name in sections_dict.values() if name not in sections_with_active]
-            self.no_active_widget.update_data(sections_without_active)
-            
-            sections_with_completed = set(section_completed_counts.keys())
-            sections_without_completed = [name for name in sections_dict.values() if name not in sections_with_completed]
-            self.no_completed_widget.update_data(sections_without_completed)
-            
-            timestamp = data.get('timestamp', '')
-            if timestamp:
-                dt = datetime.fromisoformat(timestamp)
-                self.time_label.setText(f'Обновлено: {dt.strftime("%H:%M:%S")}')
-            else:
-                current_time = QtCore.QDateTime.currentDateTime().toString('hh:mm:ss')
-                self.time_label.setText(f'Обновлено: {current_time}')
+            self.canvas.create_pie_chart(view['section_counts'])
+            self.progress_widget.update_data(view['top_sections'])
+            self.no_active_widget.update_data(view['without_active'])
+            self.no_completed_widget.update_data(view['without_completed'])
             
         except Exception as e:
             print(f"❌ Ошибка обновления: {e}")
@@ -1108,14 +3367,16 @@ class ProjectPage(QtWidgets.QWidget):
             print(traceback.format_exc())
 
 
-# Обновленный класс WeeklyPage
 class WeeklyPage(QtWidgets.QWidget):
     """Страница с недельной статистикой и календарем месяца"""
+    RESOURCES = ('completed',)  # Что запрашивать, пока страница на экране (FetchPlanner)
+    
     def __init__(self, api, font_family):
         super().__init__()
         self.api = api
         self.font_family = font_family
         self.current_data = None
+        self.render_key = None  # Отпечаток данных, из которых нарисована страница
         self.setup_ui()
     
     def setup_ui(self):
@@ -1133,7 +3394,7 @@ class WeeklyPage(QtWidgets.QWidget):
         title_label.setStyleSheet("color: #2c3e50; padding: 10px;")
         title_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         
-        self.canvas = MplCanvas(self, width=8, height=7, dpi=100, font_family=self.font_family)
+        self.canvas = create_chart_canvas('bar', self, width=8, height=7, dpi=100, font_family=self.font_family)
         
         # Время обновления
         self.time_label = QtWidgets.QLabel('Загрузка данных...')
@@ -1172,61 +3433,46 @@ class WeeklyPage(QtWidgets.QWidget):
         main_layout.addWidget(left_widget, stretch=3)
         main_layout.addWidget(right_widget, stretch=2)
     
+    @staticmethod
+    def build_view(data):
+        """Модель страницы; даты календаря - строками, чтобы модель сохранялась в снимок"""
+        metrics = data_metrics(data)
+        return {
+            'today': metrics.today.isoformat(),
+            'weekday_counts': metrics.weekday_counts,
+            'week_total': metrics.week_total,
+            'month_total': metrics.month_total,
+            'calendar_counts': sorted((day.isoformat(), count) for day, count in metrics.calendar_counts.items())
+        }
+    
     def update_from_data(self, data):
-        """Обновить интерфейс из данных"""
+        """Обновить интерфейс из данных (полного набора или сохраненного снимка)"""
         try:
             self.current_data = data
+            view = data_views(data)['weekly']
+            weekly_count = view['week_total']
+            monthly_count = view['month_total']
             
-            all_completed = data.get('all_completed', [])
-            
-            # Обновляем столбчатый график
-            now = datetime.now(timezone.utc)
-            start_of_week = now - timedelta(days=now.weekday())
-            start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            weekday_counts = {
-                'Пн': 0, 'Вт': 0, 'Ср': 0, 'Чт': 0, 'Пт': 0, 'Сб': 0, 'Вс': 0
-            }
-            weekday_map = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
-            
-            weekly_count = 0
-            monthly_count = 0
-            
-            # Определяем начало месяца
-            start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            set_update_time(self.time_label, data)
             
-            for task in all_completed:
-                completed_at = task.get('completed_at')
-                if completed_at:
-                    task_date = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
-                    
-                    # Подсчет для недели
-                    if task_date >= start_of_week:
-                        weekday = weekday_map[task_date.weekday()]
-                        weekday_counts[weekday] += 1
-                        weekly_count += 1
-                    
-                    # Подсчет для месяца
-                    if task_date >= start_of_month:
-                        monthly_count += 1
+            # Показатели не изменились - график и календарь не перерисовываем
+            render_key = content_fingerprint(view)
+            if render_key == self.render_key:
+                return
+            self.render_key = render_key
             
-            self.canvas.create_bar_chart(weekday_counts)
+            # Обновляем столбчатый график
+            self.canvas.create_bar_chart(view['weekday_counts'])
             
             # Обновляем календарь месяца
-            self.month_calendar.update_data(all_completed)
+            self.month_calendar.update_data({
+                date.fromisoformat(day): count for day, count in view['calendar_counts']
+            })
             
             # Обновляем виджеты статистики
             self.weekly_stats.update_data(weekly_count)
             self.monthly_stats.update_data(monthly_count)
             
-            timestamp = data.get('timestamp', '')
-            if timestamp:
-                dt = datetime.fromisoformat(timestamp)
-                self.time_label.setText(f'Обновлено: {dt.strftime("%H:%M:%S")}')
-            else:
-                current_time = QtCore.QDateTime.currentDateTime().toString('hh:mm:ss')
-                self.time_label.setText(f'Обновлено: {current_time}')
-            
             print(f"✅ Недельная статистика: {weekly_count} задач | Месячная: {monthly_count} задач")
             
         except Exception as e:
@@ -1282,40 +3528,15 @@ class TasksListWidget(QtWidgets.QFrame):
         
         self.main_layout.addWidget(header_widget)
         
-        # Scroll area для задач
-        scroll = QtWidgets.QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: #f8f9fa;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #e9ecef;
-                width: 8px;
-                border-radius: 4px;
-            }
-            QScrollBar::handle:vertical {
-                background: #6c757d;
-                border-radius: 4px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background: #495057;
-            }
-        """)
-        
-        # Контейнер для задач
-        self.items_container = QtWidgets.QWidget()
-        self.items_container.setStyleSheet("background-color: #f8f9fa;")
-        self.items_layout = QtWidgets.QVBoxLayout(self.items_container)
-        self.items_layout.setContentsMargins(0, 0, 0, 0)
-        self.items_layout.setSpacing(5)
-        self.items_layout.addStretch()  # Растяжка в конце
+        self.empty_label = QtWidgets.QLabel("✅ Нет задач")
+        self.empty_label.setFont(QtGui.QFont(self.font_family, 10))
+        self.empty_label.setStyleSheet("color: #6c757d; padding: 10px;")
+        self.empty_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.main_layout.addWidget(self.empty_label)
         
-        scroll.setWidget(self.items_container)
-        self.main_layout.addWidget(scroll, stretch=1)
+        # Список задач: рисуются только видимые строки
+        self.list_view = create_card_list_view(self.font_family, '#2c3e50')
+        self.main_layout.addWidget(self.list_view, stretch=1)
         
         # Кнопка "Показать все" - фиксированная высота
         self.expand_btn = QtWidgets.QPushButton('▼ Показать все')
@@ -1357,84 +3578,58 @@ class TasksListWidget(QtWidgets.QFrame):
         """Обновить список задач"""
         self.tasks = tasks
         self.count_label.setText(str(len(tasks)))
+        today = date.today().toordinal()
+        self.list_view.model().set_rows([self.card_texts(task, today) for task in tasks])
         self.is_expanded = False
         self.render_items()
     
+    @staticmethod
+    def card_texts(task, today):
+        """Текст карточки задачи и подпись с возрастом задачи (today - сегодняшний день как ordinal)"""
+        # Название задачи
+        task_name = task.get('content', 'Без названия')
+        
+        # Приоритет (если есть)
+        priority = task.get('priority', 1)
+        priority_emoji = ''
+        if priority == 4:
+            priority_emoji = '🔴 '
+        elif priority == 3:
+            priority_emoji = '🟠 '
+        elif priority == 2:
+            priority_emoji = '🔵 '
+        
+        # Дата создания
+        date_text = None
+        created_at = task.get('created_at', '')
+        if created_at:
+            # Дата уже разобрана при построении колонок - берем ее из кэша
+            _, created_day, _ = timestamp_parts(created_at)
+            days_old = today - created_day
+            date_text = f"Создана {days_old} дн. назад ({date.fromordinal(created_day).strftime('%d.%m.%Y')})"
+        
+        return f"{priority_emoji}• {task_name}", date_text
+    
     def render_items(self):
-        """Отрисовать элементы списка"""
-        # Очищаем старые виджеты (кроме stretch в конце)
-        while self.items_layout.count() > 1:
-            child = self.items_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        """Показать список (свернутый - первые 5 задач)"""
+        self.list_view.model().set_limit(None if self.is_expanded else 5)
         
-        if not self.tasks:
-            empty_label = QtWidgets.QLabel("✅ Нет задач")
-            empty_label.setFont(QtGui.QFont(self.font_family, 10))
-            empty_label.setStyleSheet("color: #6c757d; padding: 10px;")
-            empty_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-            self.items_layout.insertWidget(0, empty_label)
-            self.expand_btn.setVisible(False)
-        else:
-            items_to_show = self.tasks if self.is_expanded else self.tasks[:5]
-            
-            for i, task in enumerate(items_to_show):
-                # Контейнер для задачи
-                task_container = QtWidgets.QWidget()
-                task_layout = QtWidgets.QVBoxLayout(task_container)
-                task_layout.setContentsMargins(0, 0, 0, 0)
-                task_layout.setSpacing(3)
-                
-                # Название задачи
-                task_name = task.get('content', 'Без названия')
-                
-                # Приоритет (если есть)
-                priority = task.get('priority', 1)
-                priority_emoji = ''
-                if priority == 4:
-                    priority_emoji = '🔴 '
-                elif priority == 3:
-                    priority_emoji = '🟠 '
-                elif priority == 2:
-                    priority_emoji = '🔵 '
-                
-                task_label = QtWidgets.QLabel(f"{priority_emoji}• {task_name}")
-                task_label.setFont(QtGui.QFont(self.font_family, 10))
-                task_label.setStyleSheet("""
-                    color: #2c3e50;
-                    padding: 8px;
-                    background-color: #ffffff;
-                    border-radius: 5px;
-                """)
-                task_label.setWordWrap(True)
-                task_layout.addWidget(task_label)
-                
-                # Дата создания
-                created_at = task.get('created_at', '')
-                if created_at:
-                    created_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    days_old = (datetime.now(timezone.utc) - created_date).days
-                    
-                    date_text = f"Создана {days_old} дн. назад ({created_date.strftime('%d.%m.%Y')})"
-                    
-                    date_label = QtWidgets.QLabel(date_text)
-                    date_label.setFont(QtGui.QFont(self.font_family, 8))
-                    date_label.setStyleSheet("color: #6c757d; padding-left: 20px;")
-                    task_layout.addWidget(date_label)
-                
-                self.items_layout.insertWidget(i, task_container)
-            
-            self.expand_btn.setVisible(len(self.tasks) > 5)
+        self.empty_label.setVisible(not self.tasks)
+        self.list_view.setVisible(bool(self.tasks))
+        self.expand_btn.setVisible(len(self.tasks) > 5)
 
 
 class PlanningPage(QtWidgets.QWidget):
     """Страница планирования и управления задачами"""
+    RESOURCES = ('items', 'sections')  # Что запрашивать, пока страница на экране (FetchPlanner)
+    
     def __init__(self, api, project_id, font_family):
         super().__init__()
         self.api = api
         self.project_id = project_id
         self.font_family = font_family
         self.current_data = None
+        self.render_key = None  # Отпечаток данных, из которых нарисована страница
         self.setup_ui()
     
     def setup_ui(self):
@@ -1481,68 +3676,77 @@ class PlanningPage(QtWidgets.QWidget):
         
         main_layout.addLayout(content_layout, stretch=1)
     
+    # Поля задач, которые нужны спискам (остальные в снимок не попадают)
+    VIEW_TASK_FIELDS = ('id', 'content', 'priority', 'created_at')
+    
+    @staticmethod
+    def build_view(data):
+        """Модель страницы: залежавшиеся задачи и задачи I квадранта"""
+        sections_dict = data.get('sections', {})
+        active_tasks = data.get('active_tasks', [])
+        active = data_columns(data, 'active_tasks')
+        
+        # Находим старые задачи (созданы более OLD_TASK_DAYS дней назад)
+        old_threshold = time.time() - OLD_TASK_DAYS * 86400
+        old_tasks = active.select(active.has_time & (active.epoch < old_threshold))
+        
+        # Если нет задач старше 30 дней, берем 3 самые старые
+        if not old_tasks and active_tasks:
+            # Сортируем все активные задачи по дате создания
+            tasks_with_dates = []
+            for task in active_tasks:
+                created_at = task.get('created_at', '')
+                if created_at:
+                    tasks_with_dates.append(task)
+            
+            tasks_with_dates.sort(key=lambda x: x.get('created_at', ''))
+            old_tasks = tasks_with_dates[:3]  # Берем 3 самые старые
+        else:
+            # Сортируем по дате создания (самые старые первыми)
+            old_tasks.sort(key=lambda x: x.get('created_at', ''))
+        
+        # Находим раздел "I квадрант" и задачи из него
+        quadrant1_section_id = None
+        for section_id, section_name in sections_dict.items():
+            if 'I квадрант' in section_name or 'I' == section_name.strip():
+                quadrant1_section_id = section_id
+                break
+        
+        quadrant1_tasks = []
+        if quadrant1_section_id:
+            quadrant1_tasks = [task for task in active_tasks 
+                              if task.get('section_id') == quadrant1_section_id]
+            # Сортируем по приоритету (высокий приоритет первым)
+            quadrant1_tasks.sort(key=lambda x: x.get('priority', 1), reverse=True)
+        
+        fields = PlanningPage.VIEW_TASK_FIELDS
+        return {
+            'old_tasks': [{key: task[key] for key in fields if key in task} for task in old_tasks],
+            'quadrant1_tasks': [{key: task[key] for key in fields if key in task} for task in quadrant1_tasks]
+        }
+    
     def update_from_data(self, data):
-        """Обновить интерфейс из данных"""
+        """Обновить интерфейс из данных (полного набора или сохраненного снимка)"""
         try:
             self.current_data = data
+            view = data_views(data)['planning']
+            old_tasks = view['old_tasks']
+            quadrant1_tasks = view['quadrant1_tasks']
             
-            sections_dict = data.get('sections', {})
-            active_tasks = data.get('active_tasks', [])
-            
-            # Находим старые задачи (созданы более OLD_TASK_DAYS дней назад)
-            now = datetime.now(timezone.utc)
-            old_threshold = now - timedelta(days=OLD_TASK_DAYS)
+            # Обновляем время
+            set_update_time(self.time_label, data)
             
-            old_tasks = []
-            for task in active_tasks:
-                created_at = task.get('created_at', '')
-                if created_at:
-                    created_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    if created_date < old_threshold:
-                        old_tasks.append(task)
-            
-            # Если нет задач старше 30 дней, берем 3 самые старые
-            if not old_tasks and active_tasks:
-                # Сортируем все активные задачи по дате создания
-                tasks_with_dates = []
-                for task in active_tasks:
-                    created_at = task.get('created_at', '')
-                    if created_at:
-                        tasks_with_dates.append(task)
-                
-                tasks_with_dates.sort(key=lambda x: x.get('created_at', ''))
-                old_tasks = tasks_with_dates[:3]  # Берем 3 самые старые
-            else:
-                # Сортируем по дате создания (самые старые первыми)
-                old_tasks.sort(key=lambda x: x.get('created_at', ''))
-            
-            # Находим раздел "I квадрант" и задачи из него
-            quadrant1_section_id = None
-            for section_id, section_name in sections_dict.items():
-                if 'I квадрант' in section_name or 'I' == section_name.strip():
-                    quadrant1_section_id = section_id
-                    break
-            
-            quadrant1_tasks = []
-            if quadrant1_section_id:
-                quadrant1_tasks = [task for task in active_tasks 
-                                  if task.get('section_id') == quadrant1_section_id]
-                # Сортируем по приоритету (высокий приоритет первым)
-                quadrant1_tasks.sort(key=lambda x: x.get('priority', 1), reverse=True)
+            # Списки задач пересобираются, если изменились сами задачи или наступил новый день
+            # (возраст задач в подписях считается в днях от сегодняшней даты)
+            render_key = (content_fingerprint(view), date.today().toordinal())
+            if render_key == self.render_key:
+                return
+            self.render_key = render_key
             
             # Обновляем виджеты
             self.old_tasks_widget.update_data(old_tasks)
             self.quadrant1_widget.update_data(quadrant1_tasks)
             
-            # Обновляем время
-            timestamp = data.get('timestamp', '')
-            if timestamp:
-                dt = datetime.fromisoformat(timestamp)
-                self.time_label.setText(f'Обновлено: {dt.strftime("%H:%M:%S")}')
-            else:
-                current_time = QtCore.QDateTime.currentDateTime().toString('hh:mm:ss')
-                self.time_label.setText(f'Обновлено: {current_time}')
-            
             print(f"✅ Планирование: {len(old_tasks)} старых задач, {len(quadrant1_tasks)} в I квадранте")
             
         except Exception as e:
@@ -1551,8 +3755,155 @@ class PlanningPage(QtWidgets.QWidget):
             print(traceback.format_exc())
 
 
+def build_views(data):
+    """Модели всех страниц аналитики - из них страницы рисуются и из них же состоит снимок"""
+    return {
+        'project': ProjectPage.build_view(data),
+        'weekly': WeeklyPage.build_view(data),
+        'planning': PlanningPage.build_view(data)
+    }
+
+
+def data_views(data):
+    """Модели страниц набора данных; строятся на месте, если загрузчик их не добавил"""
+    if 'views' not in data:
+        data['views'] = build_views(data)
+    return data['views']
+
+
+class RefreshScheduler(QtCore.QObject):
+    """Планировщик автообновления вместо таймера с постоянным интервалом.
+    
+    Следующее обновление назначается только после окончания текущего, поэтому
+    обновления не накладываются. Интервал короткий (UPDATE_INTERVAL) после действий
+    пользователя и изменений в данных и растет до REFRESH_MAX_INTERVAL, пока данные
+    не меняются. Ошибки 429 и 5xx откладывают обновление (Retry-After или
+    экспоненциальная пауза, как и любая другая ошибка загрузки), бюджет запросов
+    токена не дает выйти за лимит Todoist.
+    """
+    refresh_due = QtCore.pyqtSignal()
+    
+    def __init__(self, budget, parent=None):
+        super().__init__(parent)
+        self.budget = budget
+        self.min_interval = UPDATE_INTERVAL / 1000
+        self.interval = self.min_interval
+        self.last_activity = time.monotonic()
+        self.backoff_until = 0.0
+        self.failures = 0
+        self.cycle_cost = 1  # Запросов в последнем обновлении
+        self.running = False
+        
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+        # Активность - возврат к окну; кнопки окна подключает MainWindow
+        QtWidgets.QApplication.instance().applicationStateChanged.connect(self.on_application_state)
+    
+    def on_application_state(self, state):
+        if state == QtCore.Qt.ApplicationState.ApplicationActive:
+            self.note_activity()
+    
+    def note_activity(self):
+        """Пользователь работает с окном - следующее обновление не позже короткого интервала"""
+        self.last_activity = time.monotonic()
+        if self.running or not self.timer.isActive():
+            return
+        if self.timer.remainingTime() > self.min_interval * 1000 * (1 + REFRESH_JITTER):
+            self.schedule()
+    
+    def cycle_started(self):
+        """Обновление началось (по таймеру или вручную)"""
+        self.running = True
+        self.timer.stop()
+    
+    def cycle_finished(self, changed, cost, error=None):
+        """Выбрать интервал по результату обновления и назначить следующее"""
+        self.running = False
+        self.cycle_cost = max(cost, 1)
+        
+        if error is None:
+            self.failures = 0
+            if changed:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * REFRESH_IDLE_FACTOR, REFRESH_MAX_INTERVAL)
+        else:
+            self.failures += 1
+            retry_after = getattr(error, 'retry_after', None)
+            if retry_after is None:
+                retry_after = min(self.min_interval * (2 ** self.failures), REFRESH_MAX_INTERVAL)
+            self.backoff_until = time.monotonic() + retry_after
+            print(f"⚠️ Обновление отложено на {retry_after:.0f} с")
+        self.schedule()
+    
+    def next_delay(self):
+        """Пауза до следующего обновления, секунды"""
+        now = time.monotonic()
+        if now - self.last_activity < REFRESH_ACTIVITY_WINDOW:
+            delay = self.min_interval
+        else:
+            delay = self.interval
+        delay *= random.uniform(1 - REFRESH_JITTER, 1 + REFRESH_JITTER)
+        
+        delay = max(delay, self.backoff_until - now)
+        budget_delay = self.budget.delay_for(self.cycle_cost)
+        if budget_delay > delay:
+            print(f"⚠️ Бюджет запросов: {self.budget.used()} из {self.budget.limit}, обновление через {budget_delay:.0f} с")
+            delay = budget_delay
+        return delay
+    
+    def schedule(self):
+        self.timer.start(int(self.next_delay() * 1000))
+    
+    def refresh_soon(self):
+        """Открытой странице нужны устаревшие данные - обновить, не дожидаясь интервала"""
+        if self.running:
+            return
+        delay = max(self.backoff_until - time.monotonic(), self.budget.delay_for(self.cycle_cost), 0.0)
+        self.timer.start(int(delay * 1000))
+    
+    def on_timeout(self):
+        if not self.running:
+            self.refresh_due.emit()
+
+
+class FetchPlanner:
+    """Набор ресурсов для очередного обновления.
+    
+    Ресурс запрашивается, если он нужен видимой странице и старше своего FETCH_TTL,
+    или если он не нужен никому на экране, но старше FETCH_BACKGROUND_TTL.
+    """
+    
+    def __init__(self, ttl=None, background_ttl=FETCH_BACKGROUND_TTL):
+        self.ttl = dict(ttl or FETCH_TTL)
+        self.background_ttl = background_ttl
+        self.fetched_at = {}  # {ресурс: time.monotonic() начала успешной загрузки}
+    
+    def plan(self, visible_resources, min_age=0.0):
+        """Ресурсы, которые пора запросить; min_age - не раньше, чем через столько секунд"""
+        now = time.monotonic()
+        due = set()
+        for resource, ttl in self.ttl.items():
+            fetched_at = self.fetched_at.get(resource)
+            if fetched_at is None:
+                due.add(resource)
+                continue
+            max_age = ttl if resource in visible_resources else max(ttl, self.background_ttl)
+            if now - fetched_at >= max(max_age, min_age):
+                due.add(resource)
+        return due
+    
+    def mark_fetched(self, resources, started_at):
+        """Запомнить время успешной загрузки (по началу: изменения во время запроса не потеряны)"""
+        for resource in resources:
+            self.fetched_at[resource] = started_at
+
+
 # Обновите MainWindow:
 class MainWindow(QtWidgets.QMainWindow):
+    startup_finished = QtCore.pyqtSignal()
+    
     def __init__(self, font_family=DEFAULT_FONT_FAMILY):
         super().__init__()
         self.font_family = font_family
@@ -1564,7 +3915,19 @@ class MainWindow(QtWidgets.QMainWindow):
         
         self.api = TodoistAPI(API_TOKEN)
         self.project_id = PROJECT_ID
+        # Хранилище, страницы и кэш подключаются в finish_startup - после первой отрисовки окна
+        self.store = None
+        self.sync_engine = None
+        self.completed_store = None
+        self.show_local_data = False
+        self.startup_scheduled = False
         self.loader_thread = None
+        self.data_fingerprint = None  # Отпечаток последнего показанного набора данных
+        self.cycle_changed = False  # Обновление принесло новые данные
+        self.cycle_fetch_started = None
+        self.fetch_planner = FetchPlanner()
+        self.current_data = None
+        self.dirty_pages = set()  # Страницы, которые еще не показывали последние данные
         
         central_widget = QtWidgets.QWidget()
         self.setCentralWidget(central_widget)
@@ -1617,7 +3980,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 background-color: #6c757d;
             }
         """)
-        self.refresh_btn.clicked.connect(self.start_data_loading)
+        self.refresh_btn.clicked.connect(lambda: self.start_data_loading(force=True))
+        self.refresh_btn.setEnabled(False)
         self.refresh_btn.setCursor(QtGui.QCursor(QtCore.Qt.CursorShape.PointingHandCursor))
         sidebar_layout.addWidget(self.refresh_btn)
         
@@ -1629,16 +3993,24 @@ class MainWindow(QtWidgets.QMainWindow):
         # QStackedWidget для переключения страниц
         self.stacked_widget = QtWidgets.QStackedWidget()
         
-        # Создаем страницы
-        self.project_page = ProjectPage(self.api, self.project_id, self.font_family)
-        self.weekly_page = WeeklyPage(self.api, self.font_family)
-        self.planning_page = PlanningPage(self.api, self.project_id, self.font_family)
-        self.creation_page = TaskCreationPage(self.api, self.project_id, self.font_family)  # Передаем api и project_id
-
-        self.stacked_widget.addWidget(self.project_page)
-        self.stacked_widget.addWidget(self.weekly_page)
-        self.stacked_widget.addWidget(self.planning_page)
-        self.stacked_widget.addWidget(self.creation_page)
+        # Страницы аналитики создаются при первом показе, до этого в стеке заглушки.
+        # Страница создания задач создается сразу после первой отрисовки - ее таймер
+        # создает задачи по расписанию
+        self.page_factories = {
+            0: lambda: ProjectPage(self.api, self.project_id, self.font_family),
+            1: lambda: WeeklyPage(self.api, self.font_family),
+            2: lambda: PlanningPage(self.api, self.project_id, self.font_family)
+        }
+        self.page_resources = {
+            0: ProjectPage.RESOURCES,
+            1: WeeklyPage.RESOURCES,
+            2: PlanningPage.RESOURCES
+        }
+        self.pages = {}
+        self.creation_page = None
+        for index in range(4):
+            self.stacked_widget.addWidget(QtWidgets.QWidget())
+        self.stacked_widget.setCurrentIndex(0)
         
         pages_layout.addWidget(self.stacked_widget)
         
@@ -1658,44 +4030,140 @@ class MainWindow(QtWidgets.QMainWindow):
             }
         """)
         
-        # Таймер автообновления
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self.start_data_loading)
-        self.timer.start(UPDATE_INTERVAL)
-        
-        # Сначала загружаем кэш, потом запускаем обновление
-        self.load_cached_data()
-        QtCore.QTimer.singleShot(100, self.start_data_loading)
-    
-    def load_cached_data(self):
-        """Загрузить данные из кэша"""
-        cached_data = DataCache.load()
-        if cached_data:
-            self.project_page.update_from_data(cached_data)
-            self.weekly_page.update_from_data(cached_data)
-            self.planning_page.update_from_data(cached_data)
-            print("✅ Данные из кэша отображены")
-    
-    def start_data_loading(self):
-        """Запустить загрузку данных в фоновом потоке"""
+        # Автообновление (первое - в finish_startup, следующие назначает планировщик)
+        self.scheduler = RefreshScheduler(self.api.transport.budget, self)
+        self.scheduler.refresh_due.connect(self.start_data_loading)
+        for button in (self.refresh_btn, self.btn_project, self.btn_weekly, self.btn_planning, self.btn_creation):
+            button.clicked.connect(self.scheduler.note_activity)
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.startup_scheduled:
+            # Окно уже на экране - остальное подключаем в следующем проходе цикла событий
+            self.startup_scheduled = True
+            STARTUP_PROFILE.mark('первая отрисовка')
+            QtCore.QTimer.singleShot(0, self.finish_startup)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Если окно не перерисовалось (например, свернуто), запуск все равно завершится
+        QtCore.QTimer.singleShot(500, self.ensure_startup)
+    
+    def ensure_startup(self):
+        if not self.startup_scheduled:
+            self.startup_scheduled = True
+            self.finish_startup()
+    
+    def finish_startup(self):
+        """Подключить хранилище, построить видимую страницу и показать снимок.
+        
+        История и модель синхронизации читаются из хранилища уже в потоке загрузчика.
+        """
+        self.store = LocalStore()
+        snapshot = self.store.load_snapshot(self.project_id)
+        STARTUP_PROFILE.mark('хранилище')
+        
+        self.creation_page = TaskCreationPage(self.api, self.project_id, self.font_family, self.store)
+        self.replace_placeholder(3, self.creation_page)
+        self.ensure_page(self.stacked_widget.currentIndex())
+        STARTUP_PROFILE.mark('страницы')
+        
+        if snapshot and snapshot['views'].get('weekly', {}).get('today') != date.today().isoformat():
+            # Снимок посчитан в другой день: неделя, месяц и календарь в нем устарели
+            print("⚠️ Снимок страниц устарел, данные будут посчитаны из хранилища")
+            snapshot = None
+        
+        # Сначала показываем снимок, потом запускаем обновление
+        if snapshot:
+            self.on_data_loaded(snapshot)
+            print("✅ Снимок страниц отображен")
+        self.show_local_data = snapshot is None
+        STARTUP_PROFILE.mark('снимок страниц')
+        
+        self.refresh_btn.setEnabled(True)
+        self.start_data_loading()
+        self.startup_finished.emit()
+    
+    def start_data_loading(self, force=False):
+        """Запустить загрузку данных в фоновом потоке.
+        
+        Запрашиваются только ресурсы, которые пора обновить для видимой страницы
+        (FetchPlanner); force - кнопка обновления, запросить все.
+        """
         if self.loader_thread and self.loader_thread.isRunning():
             print("⚠️ Загрузка уже выполняется")
             return
         
+        visible = self.page_resources.get(self.stacked_widget.currentIndex(), ())
+        resources = set(FETCH_TTL) if force else self.fetch_planner.plan(visible)
+        self.scheduler.cycle_started()
+        if not resources and self.sync_engine is not None:
+            # Видимой странице нечего обновлять - запросов в этом цикле нет
+            self.scheduler.cycle_finished(False, 0)
+            return
+        
         self.refresh_btn.setEnabled(False)
         self.refresh_btn.setText('⏳')
+        self.cycle_changed = False
+        self.cycle_fetch_started = time.monotonic()
         
-        self.loader_thread = DataLoaderThread(self.api, self.project_id)
+        self.loader_thread = DataLoaderThread(
+            self.api, self.project_id, self.store, self.sync_engine, self.completed_store,
+            emit_local=self.show_local_data, resources=resources
+        )
         self.loader_thread.data_loaded.connect(self.on_data_loaded)
         self.loader_thread.error_occurred.connect(self.on_error)
         self.loader_thread.finished.connect(self.on_loading_finished)
         self.loader_thread.start()
     
     def on_data_loaded(self, data):
-        """Обработать загруженные данные"""
-        self.project_page.update_from_data(data)
-        self.weekly_page.update_from_data(data)
-        self.planning_page.update_from_data(data)
+        """Обработать загруженные данные: пометить страницы и обновить только видимую"""
+        fingerprint = data.get('fingerprint')
+        changed = fingerprint is None or fingerprint != self.data_fingerprint
+        self.data_fingerprint = fingerprint
+        self.cycle_changed = self.cycle_changed or changed
+        self.current_data = data
+        
+        if changed:
+            self.dirty_pages.update(self.page_factories)
+        else:
+            # Планирование зависит еще и от текущего времени (возраст задач) - сверяет свой срез само
+            self.dirty_pages.add(2)
+        self.refresh_page(self.stacked_widget.currentIndex())
+    
+    def ensure_page(self, index):
+        """Создать страницу аналитики при первом обращении"""
+        if index in self.pages or index not in self.page_factories:
+            return self.pages.get(index)
+        
+        page = self.page_factories[index]()
+        self.replace_placeholder(index, page)
+        
+        self.pages[index] = page
+        self.dirty_pages.add(index)
+        return page
+    
+    def replace_placeholder(self, index, page):
+        """Поставить созданную страницу на место заглушки в стеке"""
+        is_current = self.stacked_widget.currentIndex() == index
+        placeholder = self.stacked_widget.widget(index)
+        self.stacked_widget.insertWidget(index, page)
+        self.stacked_widget.removeWidget(placeholder)
+        placeholder.deleteLater()
+        if is_current:
+            self.stacked_widget.setCurrentIndex(index)
+    
+    def refresh_page(self, index):
+        """Показать на странице последние данные, если она их еще не видела"""
+        page = self.pages.get(index)
+        if page is None or self.current_data is None:
+            return
+        
+        if index in self.dirty_pages:
+            self.dirty_pages.discard(index)
+            page.update_from_data(self.current_data)
+        else:
+            set_update_time(page.time_label, self.current_data)
     
     def on_error(self, error_msg):
         """Обработать ошибку загрузки"""
@@ -1703,22 +4171,50 @@ class MainWindow(QtWidgets.QMainWindow):
     
     def on_loading_finished(self):
         """Завершение загрузки"""
+        if self.sync_engine is None:
+            # Первая загрузка подняла модели из хранилища - дальше они живут в окне
+            self.sync_engine = self.loader_thread.sync_engine
+            self.completed_store = self.loader_thread.completed_store
+            self.show_local_data = self.sync_engine is None
         self.refresh_btn.setEnabled(True)
         self.refresh_btn.setText('🔄')
+        
+        if self.loader_thread.error is None:
+            self.fetch_planner.mark_fetched(self.loader_thread.resources, self.cycle_fetch_started)
+        
+        cost = self.loader_thread.request_counter.count
+        self.scheduler.cycle_finished(self.cycle_changed, cost, self.loader_thread.error)
     
     def switch_page(self, index):
         """Переключение между страницами"""
+        # Страница создается и обновляется до показа, чтобы не мелькали старые данные
+        self.ensure_page(index)
+        self.refresh_page(index)
         self.stacked_widget.setCurrentIndex(index)
         
+        # Данные этой страницы давно не запрашивались (их не было на экране) - обновляем сразу
+        if self.store is not None and self.fetch_planner.plan(
+            self.page_resources.get(index, ()), min_age=UPDATE_INTERVAL / 1000
+        ):
+            self.scheduler.refresh_soon()
+        
         self.btn_project.setChecked(index == 0)
         self.btn_weekly.setChecked(index == 1)
         self.btn_planning.setChecked(index == 2)
         self.btn_creation.setChecked(index == 3)
+    
+    def closeEvent(self, event):
+        """Дописать отложенные изменения хранилища перед выходом"""
+        if self.store is not None:
+            self.store.flush()
+        super().closeEvent(event)
 
 # Класс для управления событиями
 class EventsManager:
     """Класс для работы с сохраненными событиями"""
     
+    lock = threading.Lock()  # Интерфейс и поток создания задач меняют файл по очереди
+    
     @staticmethod
     def load():
         """Загрузить события из файла"""
@@ -1744,114 +4240,192 @@ class EventsManager:
             print(f"💾 События сохранены")
         except Exception as e:
             print(f"❌ Ошибка сохранения событий: {e}")
+    
+    @classmethod
+    def update(cls, apply):
+        """Перечитать файл, изменить события функцией apply(events) и сохранить.
+        
+        Каждый меняет только свои поля, поэтому изменения, сделанные другим
+        за это время, не теряются.
+        """
+        with cls.lock:
+            events = cls.load()
+            apply(events)
+            cls.save(events)
 
 
 class TaskCreatorThread(QtCore.QThread):
     """Поток для создания задач в Todoist"""
     tasks_created = QtCore.pyqtSignal(int)  # Количество созданных задач
     
-    def __init__(self, api, project_id):
+    WEEKDAYS = {
+        'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+        'friday': 4, 'saturday': 5, 'sunday': 6
+    }
+    
+    def __init__(self, api, project_id, store):
         super().__init__()
         self.api = api
         self.project_id = project_id
+        self.store = store
+        self.next_run_at = None  # Когда появятся следующие задачи (считается в run)
+        self.removed_events = []  # (название, дата) прошедших запланированных событий
     
     def run(self):
-        """Проверить и создать задачи"""
+        """Создать задачи, которые пора создать, в том числе пропущенные с прошлого запуска"""
         try:
-            events = EventsManager.load()
+            with EventsManager.lock:
+                events = EventsManager.load()
             today = datetime.now()
             today_str = today.strftime('%Y-%m-%d')
-            today_display = today.strftime('%d.%m.%Y')
-            created_count = 0
             
             # Инициализация created_dates если нет
             if 'created_dates' not in events:
                 events['created_dates'] = {}
             
+            # Дни после прошлого запуска тоже обрабатываются (не больше TASK_CATCH_UP_DAYS)
+            first_day = today.date()
+            if events.get('last_run'):
+                missed_from = date.fromisoformat(events['last_run']) + timedelta(days=1)
+                first_day = min(first_day, max(missed_from, today.date() - timedelta(days=TASK_CATCH_UP_DAYS)))
+            
+            # Задачи, которые пора создать: (ключ в created_dates, название)
+            due_tasks = []
+            upcoming_dates = []  # Даты будущих запланированных событий
+            
             # Обработка запланированных задач
             scheduled_events = events.get('scheduled', [])
-            remaining_scheduled = []
             
             for event in scheduled_events:
-                event_date = datetime.strptime(event['date'], '%d.%m.%Y')
-                event_date_str = event_date.strftime('%Y-%m-%d')
+                event_date = datetime.strptime(event['date'], '%d.%m.%Y').date()
                 
-                # Если сегодня день события
-                if event_date.date() == today.date():
+                # Если сегодня день события или он пропущен с прошлого запуска
+                if first_day <= event_date <= today.date():
                     # Проверяем, не создавали ли мы уже эту задачу
                     task_key = f"scheduled_{event['name']}_{event['date']}"
                     
                     if task_key not in events['created_dates']:
                         # Заменяем {date} на дату события
                         task_name = event['name'].replace('{date}', event['date'])
-                        
-                        # Создаем задачу без due_date (просто задача на сегодня)
-                        result = self.api.create_task(
-                            content=task_name,
-                            project_id=self.project_id
-                        )
-                        
-                        if result:
-                            events['created_dates'][task_key] = today_str
-                            created_count += 1
-                            print(f"✅ Создана запланированная задача: {task_name}")
+                        due_tasks.append((task_key, task_name))
                 
-                # Если дата еще не наступила, оставляем событие
-                if event_date.date() >= today.date():
-                    remaining_scheduled.append(event)
-                else:
+                # Будущие даты - для расчета следующего запуска, прошедшие события удаляются
+                if event_date > today.date():
+                    upcoming_dates.append(event_date)
+                elif event_date < today.date():
+                    self.removed_events.append((event['name'], event['date']))
                     print(f"🗑️ Удалено прошедшее событие: {event['name']} ({event['date']})")
             
-            events['scheduled'] = remaining_scheduled
-            
-            # Обработка повторяющихся задач
-            weekday_map = {
-                'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-                'friday': 4, 'saturday': 5, 'sunday': 6
-            }
-            
-            current_weekday = today.weekday()
-            
-            for event in events.get('recurring', []):
-                # Проверяем, совпадает ли текущий день недели
-                for day_key in event['days']:
-                    if weekday_map.get(day_key) == current_weekday:
-                        # Проверяем, не создавали ли мы уже задачу сегодня
-                        task_key = f"recurring_{event['name']}_{today_str}"
+            # Обработка повторяющихся задач: каждый день с first_day по сегодня
+            day = first_day
+            while day <= today.date():
+                day_str = day.strftime('%Y-%m-%d')
+                day_display = day.strftime('%d.%m.%Y')
+                
+                for event in events.get('recurring', []):
+                    # Проверяем, совпадает ли день недели
+                    if any(self.WEEKDAYS.get(day_key) == day.weekday() for day_key in event['days']):
+                        # Проверяем, не создавали ли мы уже задачу в этот день
+                        task_key = f"recurring_{event['name']}_{day_str}"
                         
                         if task_key not in events['created_dates']:
-                            # Заменяем {date} на текущую дату
-                            task_name = event['name'].replace('{date}', today_display)
-                            
-                            # Создаем задачу без due_date
-                            result = self.api.create_task(
-                                content=task_name,
-                                project_id=self.project_id
-                            )
-                            
-                            if result:
-                                events['created_dates'][task_key] = today_str
-                                created_count += 1
-                                print(f"✅ Создана повторяющаяся задача: {task_name}")
-                        
-                        break  # Один раз в день создаем задачу
+                            # Заменяем {date} на дату этого дня
+                            task_name = event['name'].replace('{date}', day_display)
+                            due_tasks.append((task_key, task_name))
+                
+                day += timedelta(days=1)
             
-            # Очистка старых записей created_dates (старше 30 дней)
+            # Задачи сначала записываются в очередь: создание переживает выход и сбой сети
+            # (без due_date - просто задачи на сегодня)
+            if due_tasks:
+                self.store.add_to_outbox([
+                    (task_key, {'content': task_name, 'project_id': self.project_id})
+                    for task_key, task_name in due_tasks
+                ])
+            created_dates = {}
+            created_count = self.flush_outbox(created_dates, today_str)
+            self.store.prune_outbox(time.time() - OUTBOX_KEEP_DAYS * 86400)
+            
+            # Списки событий могли измениться, пока создавались задачи: в файл
+            # записываются только созданные задачи, дата запуска и удаление прошедших событий
             month_ago = (today - timedelta(days=30)).strftime('%Y-%m-%d')
-            events['created_dates'] = {
-                k: v for k, v in events['created_dates'].items()
-                if v >= month_ago
-            }
+            removed = set(self.removed_events)
             
-            # Сохраняем обновленные события
-            EventsManager.save(events)
+            def apply(current):
+                current_dates = current.get('created_dates', {})
+                current_dates.update(created_dates)
+                # Очистка старых записей created_dates (старше 30 дней)
+                current['created_dates'] = {k: v for k, v in current_dates.items() if v >= month_ago}
+                current['last_run'] = today.date().isoformat()
+                current['scheduled'] = [
+                    event for event in current.get('scheduled', [])
+                    if (event['name'], event['date']) not in removed
+                ]
             
+            EventsManager.update(apply)
+            
+            self.next_run_at = self.next_due_time(events, today, upcoming_dates)
             self.tasks_created.emit(created_count)
             
         except Exception as e:
+            # Повторим проверку позже, чтобы ошибка не остановила создание задач
+            self.next_run_at = datetime.now() + timedelta(seconds=TASK_CHECK_MAX_INTERVAL)
             print(f"❌ Ошибка создания задач: {e}")
             import traceback
             print(traceback.format_exc())
+    
+    def next_due_time(self, events, now, upcoming_dates):
+        """Ближайший момент, когда появятся задачи: полночь дня события или повтор из очереди"""
+        candidates = [datetime.combine(day, datetime.min.time()) for day in upcoming_dates]
+        
+        weekdays = {
+            self.WEEKDAYS.get(day_key) for event in events.get('recurring', []) for day_key in event['days']
+        }
+        for offset in range(1, 8):
+            day = now.date() + timedelta(days=offset)
+            if day.weekday() in weekdays:
+                candidates.append(datetime.combine(day, datetime.min.time()))
+                break
+        
+        retry_at = self.store.outbox_next_attempt()
+        if retry_at is not None:
+            candidates.append(datetime.fromtimestamp(retry_at))
+        return min(candidates) if candidates else None
+    
+    def flush_outbox(self, created_dates, today_str):
+        """Отправить задачи из очереди пакетом команд Sync API.
+        
+        Команда повторяется со своим сохраненным uuid, поэтому задача, отправленная
+        перед сбоем, не создается второй раз. Результат отмечается одной транзакцией.
+        """
+        pending = self.store.outbox_due()
+        if not pending:
+            return 0
+        
+        task_ids = self.api.create_tasks_batch(
+            [entry['args'] for entry in pending],
+            uuids=[entry['uuid'] for entry in pending],
+            temp_ids=[entry['temp_id'] for entry in pending]
+        )
+        
+        done, failed = [], []
+        for entry, task_id in zip(pending, task_ids):
+            if task_id:
+                done.append((entry['uuid'], None if task_id is True else task_id))
+                created_dates[entry['task_key']] = today_str
+                print(f"✅ Создана задача: {entry['args']['content']}")
+            else:
+                failed.append((entry, task_id is False))
+        
+        retrying = 0
+        for (entry, _), (status, rejections) in zip(failed, self.store.finish_outbox(done, failed)):
+            if status == 'failed':
+                print(f"❌ Задача «{entry['args']['content']}» не создана: сервер отклонил ее {rejections} раз")
+            else:
+                retrying += 1
+        if retrying:
+            print(f"⚠️ Не создано задач: {retrying}, повтор позже")
+        return len(done)
 
 # Диалог добавления запланированного события
 class AddScheduledEventDialog(QtWidgets.QDialog):
@@ -2264,21 +4838,24 @@ class EventsPanelWidget(QtWidgets.QFrame):
 # Страница создания задач
 class TaskCreationPage(QtWidgets.QWidget):
     """Страница для создания запланированных и повторяющихся задач"""
-    def __init__(self, api, project_id, font_family):
+    def __init__(self, api, project_id, font_family, store):
         super().__init__()
         self.api = api
         self.project_id = project_id
         self.font_family = font_family
+        self.store = store  # Очередь создания задач (outbox)
         self.creator_thread = None
+        self.next_run_at = None  # Когда появятся следующие задачи (None - событий нет)
+        self.events_changed = False  # События изменились во время создания задач
         self.setup_ui()
         self.load_events()
         
-        # Таймер для автоматического создания задач
+        # Задачи создаются в момент, когда они появляются (полночь дня события), а не по опросу
         self.creation_timer = QtCore.QTimer(self)
-        self.creation_timer.timeout.connect(self.create_tasks)
-        self.creation_timer.start(60000)  # Проверять каждую минуту
+        self.creation_timer.setSingleShot(True)
+        self.creation_timer.timeout.connect(self.on_creation_timer)
         
-        # Создаем задачи при запуске
+        # Создаем задачи при запуске (в том числе пропущенные, пока приложение было закрыто)
         QtCore.QTimer.singleShot(2000, self.create_tasks)
     
     def setup_ui(self):
@@ -2353,10 +4930,35 @@ class TaskCreationPage(QtWidgets.QWidget):
     
     def save_all_events(self):
         """Сохранить все события в файл"""
-        events_data = EventsManager.load()
-        events_data['recurring'] = self.recurring_panel.events
-        events_data['scheduled'] = self.scheduled_panel.events
-        EventsManager.save(events_data)
+        def apply(events_data):
+            events_data['recurring'] = list(self.recurring_panel.events)
+            events_data['scheduled'] = list(self.scheduled_panel.events)
+        
+        EventsManager.update(apply)
+        self.wake_creation()
+    
+    def wake_creation(self):
+        """События изменены - проверить их сразу, не дожидаясь расписания"""
+        if self.creator_thread and self.creator_thread.isRunning():
+            self.events_changed = True
+            return
+        self.create_tasks()
+    
+    def schedule_creation(self, next_run_at):
+        """Запланировать следующее создание задач"""
+        self.next_run_at = next_run_at
+        if next_run_at is None:
+            self.creation_timer.stop()
+            return
+        delay = max((next_run_at - datetime.now()).total_seconds(), 0)
+        # Во сне таймер может не идти - сверяем часы не реже TASK_CHECK_MAX_INTERVAL
+        self.creation_timer.start(int(min(delay, TASK_CHECK_MAX_INTERVAL) * 1000))
+    
+    def on_creation_timer(self):
+        if datetime.now() >= self.next_run_at:
+            self.create_tasks()
+        else:
+            self.schedule_creation(self.next_run_at)
     
     def create_tasks(self):
         """Запустить процесс создания задач"""
@@ -2364,11 +4966,13 @@ class TaskCreationPage(QtWidgets.QWidget):
             print("⚠️ Создание задач уже выполняется")
             return
         
+        self.events_changed = False
+        self.creation_timer.stop()
         self.create_now_btn.setEnabled(False)
         self.status_label.setText('⏳ Создание задач...')
         self.status_label.setStyleSheet("color: #FFB347;")
         
-        self.creator_thread = TaskCreatorThread(self.api, self.project_id)
+        self.creator_thread = TaskCreatorThread(self.api, self.project_id, self.store)
         self.creator_thread.tasks_created.connect(self.on_tasks_created)
         self.creator_thread.finished.connect(self.on_creation_finished)
         self.creator_thread.start()
@@ -2378,8 +4982,6 @@ class TaskCreationPage(QtWidgets.QWidget):
         if count > 0:
             self.status_label.setText(f'✅ Создано задач: {count}')
             self.status_label.setStyleSheet("color: #50C878;")
-            # Перезагружаем события (могли удалиться прошедшие)
-            self.load_events()
         else:
             self.status_label.setText('✓ Нет задач для создания')
             self.status_label.setStyleSheet("color: #6c757d;")
@@ -2388,18 +4990,197 @@ class TaskCreationPage(QtWidgets.QWidget):
         """Завершение создания задач"""
         self.create_now_btn.setEnabled(True)
         
+        # Убираем из списка только удаленные прошедшие события - остальное могли изменить за время создания
+        removed = set(self.creator_thread.removed_events)
+        if removed:
+            self.scheduled_panel.load_events([
+                event for event in self.scheduled_panel.events
+                if (event['name'], event['date']) not in removed
+            ])
+        
+        if self.events_changed:
+            # События изменили во время создания - проверяем их заново
+            QtCore.QTimer.singleShot(0, self.create_tasks)
+        else:
+            self.schedule_creation(self.creator_thread.next_run_at)
+            if self.next_run_at is not None:
+                print(f"⏰ Следующее создание задач: {self.next_run_at.strftime('%d.%m.%Y %H:%M')}")
+        
         # Через 5 секунд возвращаем стандартный статус
         QtCore.QTimer.singleShot(5000, lambda: self.status_label.setText('Готово к созданию задач'))
         QtCore.QTimer.singleShot(5000, lambda: self.status_label.setStyleSheet("color: #6c757d;"))
 
 
+def legacy_page_aggregates(all_completed, completed_tasks, sections_dict):
+    """Прежние подсчеты страниц (циклы по словарям с разбором дат) - эталон для бенчмарка"""
+    now = datetime.now(timezone.utc)
+    start_of_week = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    # ProjectPage
+    section_counts = {}
+    for task in completed_tasks:
+        task_date = datetime.fromisoformat(task['completed_at'].replace('Z', '+00:00'))
+        if task_date.month == now.month and task_date.year == now.year:
+            section_name = sections_dict.get(task.get('section_id'), 'Без раздела')
+            section_counts[section_name] = section_counts.get(section_name, 0) + 1
+    
+    # WeeklyPage
+    weekday_counts = {name: 0 for name in WEEKDAY_NAMES}
+    weekly_count = monthly_count = 0
+    for task in all_completed:
+        task_date = datetime.fromisoformat(task['completed_at'].replace('Z', '+00:00'))
+        if task_date >= start_of_week:
+            weekday_counts[WEEKDAY_NAMES[task_date.weekday()]] += 1
+            weekly_count += 1
+        if task_date >= start_of_month:
+            monthly_count += 1
+    
+    # MonthCalendarWidget
+    date_counts = {}
+    for task in all_completed:
+        task_date = datetime.fromisoformat(task['completed_at'].replace('Z', '+00:00'))
+        if task_date.year == now.year and task_date.month == now.month:
+            date_counts[task_date.date()] = date_counts.get(task_date.date(), 0) + 1
+    
+    return section_counts, weekday_counts, weekly_count, monthly_count, date_counts
+
+
+def run_aggregates_benchmark(sizes=(1000, 50000, 500000), repeats=3):
+    """Сравнить прежние циклы страниц с векторной агрегацией (--benchmark-aggregates)"""
+    rng = random.Random(42)
+    project_id = 'benchmark'
+    sections_dict = {f"s{i}": f"Раздел {i}" for i in range(12)}
+    now = datetime.now(timezone.utc)
+    
+    def best_of(func):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+    
+    print(
+        f"{'задач':>8} | {'циклы страниц':>14} | {'колонки':>10} | {'агрегация':>10} | "
+        f"{'итого':>9} | {'отрисовка':>9}"
+    )
+    for size in sizes:
+        items = [
+            {
+                'id': str(i),
+                'project_id': project_id if i % 3 else 'other',
+                'section_id': f"s{rng.randrange(12)}",
+                'completed_at': format_todoist_datetime(now - timedelta(seconds=rng.randrange(365 * 86400)))
+            }
+            for i in range(size)
+        ]
+        project_items = [item for item in items if item['project_id'] == project_id]
+        
+        timestamp_parts.cache_clear()
+        legacy_ms = best_of(lambda: legacy_page_aggregates(items, project_items, sections_dict))
+        columns_ms = best_of(lambda: TaskColumns(items, 'completed_at'))
+        columns = TaskColumns(items, 'completed_at')
+        metrics_ms = best_of(lambda: compute_metrics(columns, project_id, sections_dict))
+        
+        print(
+            f"{size:>8} | {legacy_ms:>11.1f} мс | {columns_ms:>7.1f} мс | {metrics_ms:>7.2f} мс | "
+            f"{legacy_ms / (columns_ms + metrics_ms):>8.1f}x | {legacy_ms / metrics_ms:>8.0f}x"
+        )
+    print("Итого - циклы страниц против колонок и агрегации вместе (полное обновление данных).")
+    print("Отрисовка - только агрегация: колонки уже построены загрузчиком, страница перерисовывается.")
+
+
+def run_charts_benchmark(repeats=50):
+    """Сравнить бэкенды графиков: запуск и перерисовка (--benchmark-charts)"""
+    import subprocess
+    global CHART_BACKEND
+    
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    
+    # Импорт matplotlib меряется в отдельном процессе - в этом он может быть уже загружен
+    import_code = (
+        "import time; start = time.perf_counter(); "
+        "import matplotlib.backends.backend_qtagg, matplotlib.figure; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    mpl_import_ms = float(subprocess.run(
+        [sys.executable, '-c', import_code], capture_output=True, text=True, check=True
+    ).stdout)
+    
+    weekday_sets = [
+        {name: (i * 3 + shift) % 9 for i, name in enumerate(WEEKDAY_NAMES)} for shift in range(2)
+    ]
+    section_sets = [
+        {f"Раздел {i}": (i * 5 + shift) % 11 + 1 for i in range(6)} for shift in range(2)
+    ]
+    
+    def measure(func):
+        start = time.perf_counter()
+        func()
+        app.processEvents()
+        return (time.perf_counter() - start) * 1000
+    
+    print(f"{'бэкенд':>10} | {'импорт':>9} | {'создание':>9} | {'столбцы':>9} | {'круг':>9}")
+    for backend, import_ms in (('matplotlib', mpl_import_ms), ('native', 0.0), ('image', mpl_import_ms)):
+        CHART_BACKEND = backend
+        canvases = {}
+        
+        def create():
+            canvases['bar'] = create_chart_canvas('bar')
+            canvases['pie'] = create_chart_canvas('pie')
+            for canvas in canvases.values():
+                canvas.resize(800, 600)
+                canvas.show()
+        
+        create_ms = measure(create)
+        bar_ms = sum(
+            measure(lambda: canvases['bar'].create_bar_chart(weekday_sets[i % 2])) for i in range(repeats)
+        ) / repeats
+        pie_ms = sum(
+            measure(lambda: canvases['pie'].create_pie_chart(section_sets[i % 2])) for i in range(repeats)
+        ) / repeats
+        for canvas in canvases.values():
+            canvas.close()
+        
+        print(f"{backend:>10} | {import_ms:>6.0f} мс | {create_ms:>6.1f} мс | {bar_ms:>6.2f} мс | {pie_ms:>6.2f} мс")
+    
+    if get_chart_renderer.cache_info().currsize:
+        get_chart_renderer().stop()
+    print("Импорт - холодный старт в отдельном процессе; перерисовка - среднее на обновление данных.")
+    print("Для image - время потока интерфейса: картинка рисуется в фоне и берется из кэша при повторе.")
+
+
 if __name__ == '__main__':
+    if '--benchmark-aggregates' in sys.argv:
+        run_aggregates_benchmark()
+        sys.exit(0)
+    
+    if '--benchmark-charts' in sys.argv:
+        run_charts_benchmark()
+        sys.exit(0)
+    
+    STARTUP_PROFILE.mark('импорт модулей')
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle('Fusion')
+    STARTUP_PROFILE.mark('QApplication')
     
     font_family = setup_custom_font(CUSTOM_FONT_PATH if USE_CUSTOM_FONT else None)
     app.setFont(QtGui.QFont(font_family, FONT_SIZE))
+    STARTUP_PROFILE.mark('шрифты')
     
     window = MainWindow(font_family)
+    STARTUP_PROFILE.mark('каркас окна')
     window.show()
+    
+    if '--profile-startup' in sys.argv:
+        # Отчет после показа кэша; фоновая загрузка не дожидается, а прерывается
+        def finish_profile():
+            STARTUP_PROFILE.report()
+            if window.loader_thread is not None:
+                window.loader_thread.stop()
+            window.close()
+            app.quit()
+        window.startup_finished.connect(finish_profile)
+    
     sys.exit(app.exec())